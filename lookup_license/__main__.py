@@ -6,15 +6,21 @@
 
 from argparse import RawTextHelpFormatter
 import argparse
+import json
 import logging
 import sys
 
-from lookup_license.lookuplicense import LookupLicense
-from lookup_license.lookuplicense import LicenseTextReader
+# Only light weight modules are imported here. The license index
+# (scancode), the license database (foss-flame) and the ecosystem
+# handlers are imported when needed, so that e.g. --version and
+# --list-cache start fast.
 from lookup_license.lookupurl.factory import LookupURLFactory
-from lookup_license.ll_shell import LookupLicenseShell
 from lookup_license.format import FormatterFactory
 from lookup_license.cache import LookupLicenseCache
+from lookup_license.cache import cache_location
+from lookup_license.resolver import LookupURLResolver
+from lookup_license.resolver import read_urls
+from lookup_license.lockfile import lockfiles_purls
 
 import lookup_license.config
 
@@ -85,6 +91,46 @@ def get_parser():
                         help='try to read license from maven (no scanning)',
                         default=False)
 
+    parser.add_argument('--bulk',
+                        action='store_true',
+                        help='lookup the purls (or urls/package names, together with e.g. --pypi) listed in a file, one per line, or on stdin if no file is provided. The results are output as JSON, one line per purl',
+                        default=False)
+
+    parser.add_argument('--sbom',
+                        action='store_true',
+                        help='lookup the licenses of the components (with purls) in an SBOM (CycloneDX JSON, SPDX JSON or SPDX tag-value) and output the SBOM with the identified licenses added',
+                        default=False)
+
+    parser.add_argument('--lockfile',
+                        action='store_true',
+                        help='lookup the packages in lockfiles (requirements.txt, poetry.lock, Gemfile.lock, go.mod, go.sum or the output from "mvn dependency:list"). The results are output as JSON, one line per package',
+                        default=False)
+
+    parser.add_argument('--prewarm',
+                        action='store_true',
+                        help='lookup the purls listed in one or more files (or on stdin if no file is provided), storing the results in the cache, and output a summary',
+                        default=False)
+
+    parser.add_argument('--serve',
+                        action='store_true',
+                        help='run as an HTTP/JSON service, see --host and --port',
+                        default=False)
+
+    parser.add_argument('--host',
+                        type=str,
+                        help=f'host (address) to serve on, defaults to {lookup_license.config.server_host}',
+                        default=lookup_license.config.server_host)
+
+    parser.add_argument('--port',
+                        type=int,
+                        help=f'port to serve on, defaults to {lookup_license.config.server_port}',
+                        default=lookup_license.config.server_port)
+
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        help=f'number of concurrent lookups in bulk, lockfile and SBOM mode, defaults to {lookup_license.config.resolver_workers}',
+                        default=lookup_license.config.resolver_workers)
+
     parser.add_argument('-s', '--shell',
                         action='store_true',
                         help='interactive shell',
@@ -102,7 +148,7 @@ def get_parser():
 
     parser.add_argument('-nc', '--no-cache',
                         action='store_true',
-                        help=f'don\'t use cache  ({LookupLicenseCache().cache_location()}).',
+                        help=f'don\'t use cache  ({cache_location()}).',
                         default=False)
 
     parser.add_argument('-lr', '--list-resources',
@@ -112,12 +158,34 @@ def get_parser():
 
     parser.add_argument('--clear-cache',
                         action='store_true',
-                        help=f'clear the cache ({LookupLicenseCache().cache_location()}) and exit.',
+                        help=f'clear the cache ({cache_location()}) and exit.',
                         default=False)
 
     parser.add_argument('--list-cache',
                         action='store_true',
-                        help=f'output the content of the cache ({LookupLicenseCache().cache_location()}) and exit.',
+                        help=f'output the content of the cache ({cache_location()}) and exit.',
+                        default=False)
+
+    parser.add_argument('--cache-url',
+                        type=str,
+                        help='the cache to use, e.g. sqlite:///shared/lookup-license.db or http://cache-host:8001 (default: the environment variable LOOKUP_LICENSE_CACHE_URL or the user\'s cache directory).',
+                        default=None)
+
+    parser.add_argument('--export-cache',
+                        type=str,
+                        metavar='FILE',
+                        help='write the lookup results in the cache to FILE (gzipped JSON lines) and exit.',
+                        default=None)
+
+    parser.add_argument('--import-cache',
+                        type=str,
+                        metavar='FILE',
+                        help='add the lookup results in FILE, as written with --export-cache, to the cache and exit.',
+                        default=None)
+
+    parser.add_argument('--import-no-expire',
+                        action='store_true',
+                        help='with --import-cache, keep the imported lookup results until they are evicted, e.g. on a host without network access.',
                         default=False)
 
     parser.add_argument('-uc', '--update-cache',
@@ -180,6 +248,72 @@ def maven_url(ll, url):
     result = LookupURLFactory.lookupurl('maven').lookup_url(url)
     return result
 
+def bulk_url_type(args):
+    # the package type to use for lines not being purls
+    url_types = {
+        'gitrepo': 'git',
+        'url': 'url',
+        'swift': 'swift',
+        'pypi': 'pypi',
+        'gem': 'gem',
+        'go': 'go',
+        'maven': 'maven',
+    }
+    for arg, url_type in url_types.items():
+        if getattr(args, arg):
+            return url_type
+    return None
+
+def bulk_lookup(args):
+    if args.input and args.input[0] != '-':
+        fp = open(args.input[0])
+    else:
+        fp = sys.stdin
+
+    resolver = LookupURLResolver(args.jobs, bulk_url_type(args))
+    with fp:
+        return output_resolved(resolver, read_urls(fp))
+
+def lockfile_lookup(args):
+    if not args.input:
+        raise Exception('One or more lockfiles must be provided when using --lockfile.')
+    resolver = LookupURLResolver(args.jobs)
+    return output_resolved(resolver, lockfiles_purls(args.input))
+
+def read_url_files(files):
+    if not files or files == ['-']:
+        yield from read_urls(sys.stdin)
+        return
+    for url_file in files:
+        with open(url_file) as fp:
+            yield from read_urls(fp)
+
+def prewarm_cache(args):
+    # the results are stored in the cache by the lookups, only a
+    # summary is output
+    resolver = LookupURLResolver(args.jobs, bulk_url_type(args))
+    resolved = 0
+    failed = {}
+    for url, result, error in resolver.resolve(read_url_files(args.input)):
+        if error:
+            failed[url] = str(error)
+        else:
+            resolved += 1
+    print(json.dumps({'resolved': resolved, 'failed': failed}))
+    return failed
+
+def output_resolved(resolver, urls):
+    # one JSON object per line, as soon as each url is looked up
+    failed = False
+    for url, result, error in resolver.resolve(urls):
+        if error:
+            failed = True
+            line = {'input': url, 'error': str(error)}
+        else:
+            line = {'input': url, 'result': result}
+        print(json.dumps(line), flush=True)
+    return failed
+
 def license_text(ll, texts, minimum_score):
     result = ll.lookup_license_text(" ".join(texts), minimum_score)
     return result
@@ -189,6 +323,7 @@ def output_cache(args):
     return result
 
 def interactive_shell(ll):
+    from lookup_license.ll_shell import LookupLicenseShell
     return LookupLicenseShell().cmdloop()
 
 def validate(ll, args, expr):
@@ -205,6 +340,10 @@ def main():
     if args.verbose > 2:
         logging.basicConfig(force=True, level=logging.DEBUG)
 
+    if args.cache_url:
+        # before the cache is used
+        lookup_license.config.cache_url = args.cache_url
+
     if args.clear_cache:
         LookupLicenseCache().clear()
         logging.info('Cache cleared')
@@ -215,25 +354,57 @@ def main():
     elif args.no_cache:
         LookupLicenseCache().disable()
 
-    ll = LookupLicense()
+    if args.version:
+        print(str(version_info(None, args)))
+        return
+
+    if args.export_cache:
+        count = LookupLicenseCache().export_cache(args.export_cache)
+        print(f'{count} cache entries written to {args.export_cache}')
+        sys.exit(0)
+
+    if args.import_cache:
+        count = LookupLicenseCache().import_cache(args.import_cache, expire=not args.import_no_expire)
+        print(f'{count} cache entries imported from {args.import_cache}')
+        sys.exit(0)
 
     formatter = FormatterFactory.formatter(args.output_format)
 
     if args.list_cache:
         cache_list = output_cache(args)
-        out, err = formatter.format_cache(cache_list, args.verbose)
+        out, err = formatter.format_cache(cache_list, args.verbose, LookupLicenseCache().stats())
         print(out)
         sys.exit(0)
 
+    from lookup_license.lookuplicense import LookupLicense
+    from lookup_license.lookuplicense import LicenseTextReader
+    ll = LookupLicense()
+
     if args.list_resources:
         list_resources(ll, formatter)
         sys.exit(0)
 
     try:
-        if args.version:
-            print(str(version_info(ll, args)))
-        elif args.shell:
+        if args.shell:
             return interactive_shell(ll)
+        elif args.serve:
+            from lookup_license.server import serve
+            return serve(args.host, args.port)
+        elif args.bulk:
+            failed = bulk_lookup(args)
+            sys.exit(1 if failed else 0)
+        elif args.lockfile:
+            failed = lockfile_lookup(args)
+            sys.exit(1 if failed else 0)
+        elif args.prewarm:
+            failed = prewarm_cache(args)
+            sys.exit(1 if failed else 0)
+        elif args.sbom:
+            if not args.input:
+                raise Exception('An SBOM file must be provided when using --sbom.')
+            from lookup_license.sbom import lookup_sbom
+            lookup_sbom(args.input[0], sys.stdout, args.jobs)
+            sys.exit(0)
         else:
             # no command line arguments
             # read license text from stdin
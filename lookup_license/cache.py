@@ -5,22 +5,123 @@
 from lookup_license.config import module_name
 from lookup_license.config import module_author
 
-from diskcache import Cache
+import lookup_license.config
+
 from appdirs import user_cache_dir
 
+import gzip
+import json
 import logging
+import re
+
+# bumped when the stored values (e.g. the lookup results) change
+# shape, making entries stored with another schema not used
+CACHE_SCHEMA_VERSION = 1
+
+# the files written by export_cache, gzipped JSON lines: a header
+# followed by one line per entry
+CACHE_EXPORT_FORMAT = 'lookup-license-cache'
+CACHE_EXPORT_VERSION = 1
+
+URL_CACHE_PREFIX = 'lookup-license-url:'
+HTTP_CACHE_PREFIX = 'http:'
+MISS_CACHE_PREFIX = 'http-miss:'
+# provider data looked up in batches, e.g. ClearlyDefined definitions
+PROVIDER_CACHE_PREFIX = 'provider:'
+TEXT_CACHE_PREFIX = 'lookup-license-text'
+# statistics stored in the cache, e.g. the evicted entries (see cache_backend.py)
+STATS_CACHE_PREFIX = 'lookup-license-stats:'
+
+# a url containing any of these identifies a version (or commit), and
+# is looked up with the same result over time, as is a purl with a
+# version (see pinned_url)
+PINNED_MARKERS = ['/tree/', '/blob/', '/commit/', '/versions/', '/releases/tag/']
+
+def cache_location():
+    return user_cache_dir(module_name, module_author)
+
+def canonical_url(url):
+    # the same package or repository, written differently, e.g:
+    #   pkg:PyPI/Foo_Bar@1.0 => pkg:pypi/foo-bar@1.0
+    #   https://GitHub.com/hesa/lookup-license/ => github.com/hesa/lookup-license
+    url = url.strip()
+    if url.startswith('pkg:'):
+        from packageurl import PackageURL  # noqa: I900
+        try:
+            return PackageURL.from_string(url).to_string()
+        except Exception as e:
+            logging.debug(f'canonical_url: could not parse purl {url}: {e}')
+            return url
+    for scheme in ['https://', 'http://']:
+        if url.lower().startswith(scheme):
+            url = url[len(scheme):]
+            host, sep, path = url.partition('/')
+            url = f'{host.lower()}{sep}{path}'
+            break
+    return url.rstrip('/')
+
+def url_cache_key(namespace, url):
+    # namespace, e.g. "pypi", since the same name can be looked up in
+    # different ecosystems
+    return f'{URL_CACHE_PREFIX}{namespace}:{canonical_url(url)}'
+
+def _cache_entry(value):
+    return {
+        'schema': CACHE_SCHEMA_VERSION,
+        'lookup_license_version': lookup_license.config.lookup_license_version,
+        'value': value,
+    }
+
+def _current_entry(entry):
+    return isinstance(entry, dict) and entry.get('schema') == CACHE_SCHEMA_VERSION
+
+def pinned_url(url):
+    # A purl (or name) with a version, e.g. pkg:pypi/boto3@1.35.99, but
+    # not pkg:npm/@scope/pkg, or a url identifying a version, but not
+    # git@github.com:org/repo
+    url = url.split('?')[0].split('#')[0]
+    if url.startswith('pkg:'):
+        # the version may contain ':', e.g. pkg:deb/debian/curl@1:7.88
+        name = url.split('/')[-1]
+    else:
+        name = re.split('[/:]', url)[-1]
+    if '@' in name:
+        return True
+    return any(marker in url for marker in PINNED_MARKERS)
+
+def cache_entry_kind(key):
+    if key.startswith(TEXT_CACHE_PREFIX):
+        return 'text'
+    if key.startswith(HTTP_CACHE_PREFIX):
+        return 'http'
+    if key.startswith(MISS_CACHE_PREFIX):
+        return 'miss'
+    if key.startswith(PROVIDER_CACHE_PREFIX):
+        return 'provider'
+    url = key
+    if key.startswith(URL_CACHE_PREFIX):
+        # lookup-license-url:<namespace>:<url>
+        url = key[len(URL_CACHE_PREFIX):].partition(':')[2]
+    if pinned_url(url):
+        return 'pinned'
+    return 'latest'
+
+def cache_entry_ttl(key):
+    # seconds, or None for entries not expiring
+    return lookup_license.config.cache_ttls.get(cache_entry_kind(key))
 
 class LookupLicenseCache():
 
     def _init_cache(self, update=False):
         logging.debug('LookupLicenseCache _init_cache')
-        cache_dir = self.cache_location()
-        self.cache = Cache(cache_dir)
+        from lookup_license.cache_backend import cache_backend
+        from lookup_license.cache_backend import cache_url
+        self.cache = cache_backend(cache_url(), cache_location())
         self.enabled = True
         self.update_mode = update
 
     def cache_location(self):
-        return user_cache_dir(module_name, module_author)
+        return self.cache.location()
 
     def set_update_mode(self, enable_update=True):
         self.update_mode = enable_update
@@ -32,19 +133,30 @@ class LookupLicenseCache():
         self.enabled = True
 
     def add(self, key, value):
+        # returns True if the value was stored
+        return self.__add(key, value, cache_entry_ttl(key))
+
+    def __add(self, key, value, expire):
+        # expire is seconds, or None for a value not expiring
         if not self.enabled:
             logging.debug(f'LookupLicenseCache is disabled, will not store {key}')
-            return
+            return False
 
         logging.debug(f'LookupLicenseCache add {key}')
 
-        if not self.cache.add(key, value):
+        entry = _cache_entry(value)
+        try:
+            if self.cache.add(key, entry, expire=expire):
+                logging.debug(f'LookupLicenseCache added: {key}')
+                return True
             if self.update_mode:
-                self.cache.set(key, value)
-                logging.debug('LookupLicenseCache updated: {key}')
-        else:
-            logging.debug('LookupLicenseCache added: {key}')
-            logging.debug('LookupLicenseCache Objects in cache: {self.cache.size}')
+                self.cache.set(key, entry, expire=expire)
+                logging.debug(f'LookupLicenseCache updated: {key}')
+                return True
+        except Exception as e:
+            # the lookups work without the cache, e.g. with the cache server down
+            logging.info(f'LookupLicenseCache could not store {key}: {e}')
+        return False
 
     def get(self, key):
         logging.debug(f'LookupLicenseCache get {key}')
@@ -53,7 +165,52 @@ class LookupLicenseCache():
         if self.update_mode:
             raise Exception("LookupLicenseCache update mode enabled")
 
-        return self.cache[key]
+        entry = self.cache.get(key)
+        if entry is None:
+            raise KeyError(key)
+        if not _current_entry(entry):
+            # e.g. stored by an older version, replaced by the next add
+            self.cache.delete(key)
+            raise Exception(f'LookupLicenseCache entry {key} not stored with schema {CACHE_SCHEMA_VERSION}')
+        return entry['value']
+
+    def get_stored(self, key):
+        # the stored value, also in update mode (e.g. for revalidation), or None
+        #
+        # get_stored and store are used for data owned by the caller
+        # (e.g. downloads), stored as is without schema
+        if not self.enabled:
+            return None
+        return self.cache.get(key)
+
+    def store(self, key, value, expire=None):
+        # store (or replace) the value, regardless of update mode,
+        # expiring after expire seconds or the TTL of the entry kind
+        if not self.enabled:
+            logging.debug(f'LookupLicenseCache is disabled, will not store {key}')
+            return
+        if expire is None:
+            expire = cache_entry_ttl(key)
+        try:
+            self.cache.set(key, value, expire=expire)
+        except Exception as e:
+            logging.info(f'LookupLicenseCache could not store {key}: {e}')
+
+    def stats(self):
+        hits, misses = self.cache.stats()
+        entries = sum(1 for key in self.cache.keys() if not key.startswith(STATS_CACHE_PREFIX))
+        return {
+            'backend': self.cache.name(),
+            'location': self.cache.location(),
+            'entries': entries,
+            'hits': hits,
+            'misses': misses,
+            # evicted to keep the size limit, not counting expired entries
+            'evicted': self.cache.evictions(),
+            'bytes': self.cache.volume(),
+            'size_limit': lookup_license.config.cache_size_limit,
+            'eviction_policy': lookup_license.config.cache_eviction_policy,
+        }
 
     def close(self):
         self.cache.close()
@@ -71,8 +228,61 @@ class LookupLicenseCache():
     def cache(self):
         return self.cache
 
+    def __result_keys(self):
+        for entry_key in self.cache.keys():
+            if entry_key.startswith((HTTP_CACHE_PREFIX, MISS_CACHE_PREFIX, PROVIDER_CACHE_PREFIX, STATS_CACHE_PREFIX)):
+                # raw downloads, failed downloads, provider data and statistics, not lookup results
+                continue
+            yield entry_key
+
     def list_cache(self):
         entries = {}
-        for entry_key in self.cache:
-            entries[entry_key] = self.cache[entry_key]
+        for entry_key in self.__result_keys():
+            entry = self.cache.get(entry_key)
+            entries[entry_key] = entry['value'] if _current_entry(entry) else entry
         return entries
+
+    def export_cache(self, path):
+        # writes the lookup results to path, returns the number of entries written
+        count = 0
+        with gzip.open(path, 'wt') as fp:
+            fp.write(json.dumps({
+                'format': CACHE_EXPORT_FORMAT,
+                'version': CACHE_EXPORT_VERSION,
+                'schema': CACHE_SCHEMA_VERSION,
+                'lookup_license_version': lookup_license.config.lookup_license_version,
+            }) + '\n')
+            for entry_key in self.__result_keys():
+                entry = self.cache.get(entry_key)
+                if not _current_entry(entry):
+                    continue
+                try:
+                    line = json.dumps({'key': entry_key, 'value': entry['value']})
+                except (TypeError, ValueError) as e:
+                    logging.info(f'LookupLicenseCache: not exporting {entry_key}: {e}')
+                    continue
+                fp.write(line + '\n')
+                count += 1
+        return count
+
+    def import_cache(self, path, expire=True):
+        # adds the lookup results written by export_cache, keeping
+        # the entries already in the cache (unless in update mode),
+        # returns the number of entries stored. With expire False, the
+        # entries do not expire (e.g. on a host without network access)
+        count = 0
+        with gzip.open(path, 'rt') as fp:
+            try:
+                header = json.loads(fp.readline())
+            except ValueError:
+                header = {}
+            if header.get('format') != CACHE_EXPORT_FORMAT or header.get('version') != CACHE_EXPORT_VERSION:
+                raise Exception(f'{path} is not a lookup-license cache file (version {CACHE_EXPORT_VERSION}).')
+            if header.get('schema') != CACHE_SCHEMA_VERSION:
+                raise Exception(f'{path} was exported by lookup-license {header.get("lookup_license_version")}, with cache schema {header.get("schema")} (using {CACHE_SCHEMA_VERSION}).')
+            for line in fp:
+                entry = json.loads(line)
+                ttl = cache_entry_ttl(entry['key']) if expire else None
+                if self.__add(entry['key'], entry['value'], ttl):
+                    count += 1
+        return count
@@ -0,0 +1,498 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+#
+# Storage used by LookupLicenseCache, selected with a cache url
+# (config.cache_url, the environment variable LOOKUP_LICENSE_CACHE_URL
+# or --cache-url):
+#
+# * diskcache (default), in the user's cache directory or a given
+#   directory, e.g. "diskcache:///var/cache/lookup-license"
+#
+# * SQLite, e.g. on a volume shared by many processes or containers:
+#   "sqlite:///shared/lookup-license.db"
+#
+# * HTTP, a key-value store shared by many hosts, e.g. served by
+#   lookup_license.cache_server: "http://cache.example.com:8001"
+#
+# All backends can be used by many processes at the same time.
+#
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import quote
+
+import lookup_license.config
+
+# the number of entries evicted to keep the size limit, counted (in
+# the cache) when evicting, listed with the lookup-license statistics
+EVICTED_KEY = 'lookup-license-stats:evicted'
+
+# a value not stored in the cache
+MISSING = object()
+
+def _json_default(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f'{value.__class__.__name__} can not be stored in the cache')
+
+def _dumps(value):
+    # the cached values as JSON, sets as (sorted) lists
+    return json.dumps(value, default=_json_default)
+
+class CacheBackend():
+
+    # check the size at the first write and every CULL_INTERVAL writes
+    CULL_INTERVAL = 64
+
+    def name(self):
+        return None
+
+    def location(self):
+        return None
+
+    def add(self, key, value, expire=None):
+        # store the value unless the key is already stored, returns
+        # True if the value was stored
+        raise Exception('Subclasses to CacheBackend must implement: add')
+
+    def set(self, key, value, expire=None):
+        raise Exception('Subclasses to CacheBackend must implement: set')
+
+    def get(self, key, default=None):
+        raise Exception('Subclasses to CacheBackend must implement: get')
+
+    def delete(self, key):
+        raise Exception('Subclasses to CacheBackend must implement: delete')
+
+    def incr(self, key, delta=1):
+        raise Exception('Subclasses to CacheBackend must implement: incr')
+
+    def keys(self):
+        raise Exception('Subclasses to CacheBackend must implement: keys')
+
+    def stats(self):
+        # (hits, misses)
+        raise Exception('Subclasses to CacheBackend must implement: stats')
+
+    def volume(self):
+        # bytes used
+        raise Exception('Subclasses to CacheBackend must implement: volume')
+
+    def evictions(self):
+        # entries evicted to keep the size limit (not counted as a hit or miss)
+        raise Exception('Subclasses to CacheBackend must implement: evictions')
+
+    def cull(self):
+        # remove expired entries, and evict entries above the size limit
+        pass
+
+    def clear(self):
+        raise Exception('Subclasses to CacheBackend must implement: clear')
+
+    def close(self):
+        pass
+
+class DiskCacheBackend(CacheBackend):
+
+    #
+    # Entries are evicted by cull, not by diskcache when storing
+    # (cull_limit=0), to count the evicted entries.
+    #
+    # Hits and misses are counted in memory, by this process, since
+    # diskcache counting them writes to the database at every read.
+    #
+
+    def __init__(self, directory):
+        from diskcache import Cache
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.cache = Cache(directory,
+                           size_limit=lookup_license.config.cache_size_limit,
+                           eviction_policy=lookup_license.config.cache_eviction_policy,
+                           cull_limit=0,
+                           statistics=0)
+
+    def __written(self):
+        with self.lock:
+            self.writes += 1
+            cull = self.writes % self.CULL_INTERVAL == 1
+        if cull:
+            self.cull()
+
+    def name(self):
+        return 'diskcache'
+
+    def location(self):
+        return self.directory
+
+    def add(self, key, value, expire=None):
+        added = self.cache.add(key, value, expire=expire)
+        if added:
+            self.__written()
+        return added
+
+    def set(self, key, value, expire=None):
+        self.cache.set(key, value, expire=expire)
+        self.__written()
+
+    def get(self, key, default=None):
+        value = self.cache.get(key, default=MISSING, retry=True)
+        if lookup_license.config.cache_statistics:
+            with self.lock:
+                if value is MISSING:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+        return default if value is MISSING else value
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def incr(self, key, delta=1):
+        return self.cache.incr(key, delta, retry=True)
+
+    def keys(self):
+        return self.cache.iterkeys()
+
+    def stats(self):
+        return self.hits, self.misses
+
+    def volume(self):
+        return self.cache.volume()
+
+    def evictions(self):
+        return self.cache.get(EVICTED_KEY, default=0, retry=True)
+
+    def cull(self):
+        self.cache.expire()
+        size_limit = lookup_license.config.cache_size_limit
+        if not size_limit or self.cache.volume() <= size_limit:
+            return
+        # the expired entries are removed, the rest are evicted
+        evicted = self.cache.cull(retry=True)
+        if evicted:
+            logging.debug(f'DiskCacheBackend: evicted {evicted} entries from {self.directory}')
+            self.cache.incr(EVICTED_KEY, evicted, retry=True)
+
+    def clear(self):
+        self.cache.clear()
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        self.cache.close()
+
+class SqliteCacheBackend(CacheBackend):
+    #
+    # One database file, in WAL mode, letting many readers and one
+    # writer at a time use it. Every operation is committed directly
+    # (incr reading and writing in one transaction), a writer waiting
+    # for another one for up to config.cache_sqlite_timeout seconds.
+    # Each thread uses a connection of its own, opened again in a
+    # forked process (a connection must not be used across fork).
+    #
+    # Hits and misses are counted in memory, by this process, to keep
+    # reads from writing to the (possibly shared) database.
+    #
+    # Entries are evicted, least recently stored first, when the
+    # values take more than config.cache_size_limit bytes.
+    #
+    # The values are stored as JSON, not pickled, since anyone able to
+    # write to a shared database could otherwise run code in the
+    # processes reading it.
+    #
+
+    # user_version of the database, bumped when the table changes
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self.__connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if connection.execute('PRAGMA user_version').fetchone()[0] != self.SCHEMA_VERSION:
+                # e.g. values pickled by an older lookup-license, not read
+                connection.execute('DROP TABLE IF EXISTS entries')
+                connection.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+            connection.execute('CREATE TABLE IF NOT EXISTS entries ('
+                               '  key TEXT PRIMARY KEY,'
+                               '  value TEXT,'
+                               '  size INTEGER,'
+                               '  stored REAL,'
+                               '  expire REAL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS entries_stored ON entries (stored)')
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def __connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if not connection or self.local.pid != os.getpid():
+            connection = sqlite3.connect(self.path,
+                                         timeout=lookup_license.config.cache_sqlite_timeout,
+                                         isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+            with self.lock:
+                self.connections.append((os.getpid(), connection))
+        return connection
+
+    def __execute(self, sql, parameters=()):
+        return self.__connection().execute(sql, parameters)
+
+    def __expire_at(self, expire):
+        return None if expire is None else time.time() + expire
+
+    def __written(self):
+        with self.lock:
+            self.writes += 1
+            cull = self.writes % self.CULL_INTERVAL == 1
+        if cull:
+            self.cull()
+
+    def name(self):
+        return 'sqlite'
+
+    def location(self):
+        return self.path
+
+    def add(self, key, value, expire=None):
+        data = _dumps(value)
+        now = time.time()
+        # replace an expired entry, but not a valid one
+        cursor = self.__execute('INSERT INTO entries (key, value, size, stored, expire) VALUES (?, ?, ?, ?, ?) '
+                                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, stored = excluded.stored, expire = excluded.expire '
+                                'WHERE entries.expire IS NOT NULL AND entries.expire <= ?',
+                                (key, data, len(data), now, self.__expire_at(expire), now))
+        added = cursor.rowcount == 1
+        if added:
+            self.__written()
+        return added
+
+    def set(self, key, value, expire=None):
+        data = _dumps(value)
+        self.__execute('INSERT OR REPLACE INTO entries (key, value, size, stored, expire) VALUES (?, ?, ?, ?, ?)',
+                       (key, data, len(data), time.time(), self.__expire_at(expire)))
+        self.__written()
+
+    def get(self, key, default=None):
+        row = self.__execute('SELECT value FROM entries WHERE key = ? AND (expire IS NULL OR expire > ?)',
+                             (key, time.time())).fetchone()
+        if lookup_license.config.cache_statistics:
+            with self.lock:
+                if row:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        if not row:
+            return default
+        return json.loads(row[0])
+
+    def delete(self, key):
+        self.__execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def incr(self, key, delta=1):
+        # read and write in one transaction, not expiring (like incr in diskcache)
+        connection = self.__connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+            value = (json.loads(row[0]) if row else 0) + delta
+            data = _dumps(value)
+            connection.execute('INSERT OR REPLACE INTO entries (key, value, size, stored, expire) VALUES (?, ?, ?, ?, NULL)',
+                               (key, data, len(data), time.time()))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return value
+
+    def keys(self):
+        rows = self.__execute('SELECT key FROM entries WHERE expire IS NULL OR expire > ?', (time.time(),)).fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self):
+        return self.hits, self.misses
+
+    def volume(self):
+        return self.__execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def evictions(self):
+        row = self.__execute('SELECT value FROM entries WHERE key = ?', (EVICTED_KEY,)).fetchone()
+        return json.loads(row[0]) if row else 0
+
+    def cull(self):
+        self.__execute('DELETE FROM entries WHERE expire IS NOT NULL AND expire <= ?', (time.time(),))
+        size_limit = lookup_license.config.cache_size_limit
+        if not size_limit or self.volume() <= size_limit:
+            return
+        # the least recently stored entries, taking more than the limit
+        cursor = self.__execute('DELETE FROM entries WHERE key IN ('
+                                '  SELECT key FROM ('
+                                '    SELECT key, SUM(size) OVER (ORDER BY stored DESC) AS total FROM entries WHERE key != ?)'
+                                '  WHERE total > ?)', (EVICTED_KEY, size_limit))
+        if cursor.rowcount > 0:
+            logging.debug(f'SqliteCacheBackend: evicted {cursor.rowcount} entries from {self.path}')
+            self.incr(EVICTED_KEY, cursor.rowcount)
+
+    def clear(self):
+        self.__execute('DELETE FROM entries')
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        with self.lock:
+            # connections inherited from a parent process are left to it
+            for pid, connection in self.connections:
+                if pid == os.getpid():
+                    connection.close()
+            self.connections = []
+        self.local = threading.local()
+
+class HttpCacheBackend(CacheBackend):
+    #
+    # Key-value store over HTTP, values sent as JSON:
+    #
+    #   GET    /entries/<key>    => 200 {"value": ...} or 404
+    #   PUT    /entries/<key>    {"value": ..., "expire": seconds, "mode": "add" or "set"}
+    #                            => 200 {"stored": true or false}
+    #   DELETE /entries/<key>
+    #   POST   /counters/<key>   {"delta": n} => 200 {"value": n}
+    #   GET    /entries          => 200 {"keys": [...]}
+    #   DELETE /entries
+    #   GET    /stats            => 200 {"hits": n, "misses": n, "bytes": n, "evicted": n}
+    #
+    # with the keys url encoded. Storing a value only if the key is
+    # not stored ("add") is made by the server, making it safe for
+    # many clients. Sets are sent as (sorted) lists.
+    #
+    # The server is reached with a session of its own, not retrying
+    # and with a short connect timeout. If the server can not be
+    # reached it is not used again by this process, the lookups
+    # continuing as if the cache was empty.
+    #
+
+    def __init__(self, url):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.url = url.rstrip('/')
+        self.available = True
+        self.session = requests.Session()
+        for scheme in ['http://', 'https://']:
+            self.session.mount(scheme, HTTPAdapter(pool_maxsize=lookup_license.config.http_pool_size, max_retries=0))
+
+    def __request(self, method, path, data=None, missing_ok=False):
+        # the reply, or None for a missing entry if missing_ok, and
+        # with the server not reachable
+        import requests
+        if not self.available:
+            return None
+        body = None
+        headers = {}
+        if data is not None:
+            body = _dumps(data)
+            headers['Content-Type'] = 'application/json'
+        try:
+            response = self.session.request(method, f'{self.url}{path}', data=body, headers=headers,
+                                            timeout=(lookup_license.config.cache_connect_timeout, lookup_license.config.http_timeout))
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            logging.warning(f'Could not reach the cache at {self.url}, continuing without it: {e}')
+            self.available = False
+            return None
+        if missing_ok and response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    def __entry_path(self, key):
+        return f'/entries/{quote(key, safe="")}'
+
+    def name(self):
+        return 'http'
+
+    def location(self):
+        return self.url
+
+    def add(self, key, value, expire=None):
+        data = self.__request('PUT', self.__entry_path(key), {'value': value, 'expire': expire, 'mode': 'add'})
+        return bool(data and data['stored'])
+
+    def set(self, key, value, expire=None):
+        self.__request('PUT', self.__entry_path(key), {'value': value, 'expire': expire, 'mode': 'set'})
+
+    def get(self, key, default=None):
+        data = self.__request('GET', self.__entry_path(key), missing_ok=True)
+        if data is None:
+            return default
+        return data['value']
+
+    def delete(self, key):
+        self.__request('DELETE', self.__entry_path(key), missing_ok=True)
+
+    def incr(self, key, delta=1):
+        data = self.__request('POST', f'/counters/{quote(key, safe="")}', {'delta': delta})
+        return data['value'] if data else 0
+
+    def keys(self):
+        data = self.__request('GET', '/entries')
+        return data['keys'] if data else []
+
+    def __stats(self):
+        return self.__request('GET', '/stats') or {}
+
+    def stats(self):
+        data = self.__stats()
+        return data.get('hits', 0), data.get('misses', 0)
+
+    def volume(self):
+        return self.__stats().get('bytes', 0)
+
+    def evictions(self):
+        # counted by the backend of the server
+        return self.__stats().get('evicted', 0)
+
+    def clear(self):
+        self.__request('DELETE', '/entries')
+
+    def close(self):
+        self.session.close()
+
+def cache_url():
+    return os.environ.get('LOOKUP_LICENSE_CACHE_URL') or lookup_license.config.cache_url
+
+def cache_backend(url, default_directory):
+    # the backend for a cache url, diskcache in default_directory if
+    # no url is given
+    if not url:
+        return DiskCacheBackend(default_directory)
+    if url.startswith('diskcache://'):
+        return DiskCacheBackend(url[len('diskcache://'):] or default_directory)
+    if url.startswith('sqlite://'):
+        return SqliteCacheBackend(url[len('sqlite://'):])
+    if url.startswith('http://') or url.startswith('https://'):
+        return HttpCacheBackend(url)
+    raise Exception(f'Unsupported cache url "{url}", supported are: diskcache://DIRECTORY, sqlite://FILE and http(s)://HOST[:PORT]')
@@ -0,0 +1,146 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+#
+# A key-value store, serving the protocol used by HttpCacheBackend
+# (see cache_backend.py), letting many hosts share one cache:
+#
+#    python3 -m lookup_license.cache_server sqlite:///var/cache/lookup-license.db
+#
+# and on the hosts looking up licenses:
+#
+#    lookup-license --cache-url http://cache-host:8001 ...
+#
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import unquote
+import argparse
+import json
+import logging
+
+from lookup_license.cache_backend import cache_backend
+from lookup_license.cache import cache_location
+
+import lookup_license.config
+
+ENTRIES_PATH = '/entries'
+COUNTERS_PATH = '/counters'
+
+class CacheRequestHandler(BaseHTTPRequestHandler):
+
+    def __reply(self, code, data=None):
+        content = json.dumps(data).encode('utf-8') if data is not None else b''
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def __key(self, prefix):
+        # the key in e.g. /entries/<key>, or None
+        if not self.path.startswith(f'{prefix}/'):
+            return None
+        return unquote(self.path[len(prefix) + 1:])
+
+    def __request_data(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or '{}')
+
+    def do_GET(self):
+        backend = self.server.backend
+        key = self.__key(ENTRIES_PATH)
+        if key:
+            value = backend.get(key)
+            if value is None:
+                self.__reply(404, {'error': f'No such key: {key}'})
+            else:
+                self.__reply(200, {'value': value})
+        elif self.path == ENTRIES_PATH:
+            self.__reply(200, {'keys': list(backend.keys())})
+        elif self.path == '/stats':
+            hits, misses = backend.stats()
+            self.__reply(200, {'hits': hits, 'misses': misses, 'bytes': backend.volume(), 'evicted': backend.evictions()})
+        else:
+            self.__reply(404, {'error': f'No such resource: {self.path}'})
+
+    def do_PUT(self):
+        key = self.__key(ENTRIES_PATH)
+        if not key:
+            self.__reply(404, {'error': f'No such resource: {self.path}'})
+            return
+        try:
+            data = self.__request_data()
+            value = data['value']
+        except (ValueError, KeyError) as e:
+            self.__reply(400, {'error': f'Bad request: {e}'})
+            return
+
+        if data.get('mode') == 'add':
+            stored = self.server.backend.add(key, value, data.get('expire'))
+        else:
+            self.server.backend.set(key, value, data.get('expire'))
+            stored = True
+        self.__reply(200, {'stored': stored})
+
+    def do_POST(self):
+        key = self.__key(COUNTERS_PATH)
+        if not key:
+            self.__reply(404, {'error': f'No such resource: {self.path}'})
+            return
+        try:
+            delta = int(self.__request_data().get('delta', 1))
+        except (ValueError, TypeError, AttributeError) as e:
+            self.__reply(400, {'error': f'Bad request: {e}'})
+            return
+        self.__reply(200, {'value': self.server.backend.incr(key, delta)})
+
+    def do_DELETE(self):
+        key = self.__key(ENTRIES_PATH)
+        if key:
+            self.server.backend.delete(key)
+        elif self.path == ENTRIES_PATH:
+            self.server.backend.clear()
+        else:
+            self.__reply(404, {'error': f'No such resource: {self.path}'})
+            return
+        self.__reply(200)
+
+    def log_message(self, format, *args):
+        logging.info(f'{self.address_string()} {format % args}')
+
+class CacheServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, backend, host=lookup_license.config.server_host, port=lookup_license.config.cache_server_port):
+        self.backend = backend
+        super().__init__((host, port), CacheRequestHandler)
+
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a lookup-license cache to other hosts')
+    parser.add_argument('--host', type=str, default=lookup_license.config.server_host)
+    parser.add_argument('--port', type=int, default=lookup_license.config.cache_server_port)
+    parser.add_argument('cache_url', type=str, nargs='?', default=None,
+                        help=f'the cache to serve, e.g. sqlite:///var/cache/lookup-license.db (default: {cache_location()})')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    server = CacheServer(cache_backend(args.cache_url, cache_location()), args.host, args.port)
+    logging.warning(f'Serving lookup-license cache at {server.url()}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.backend.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,67 @@ lookup_license_version = "0.1.29"
 
 default_minimum_score = 0.9
 http_timeout = 10 # seconds
+http_workers = 8 # concurrent downloads when looking up license urls
+http_async_workers = 32 # concurrent downloads using the asyncio API
+lookup_async_workers = 16 # concurrent url lookups using the asyncio API
+provider_timeout = 20 # seconds to wait for each license provider
+clearlydefined_api_url = 'https://api.clearlydefined.io'
+clearlydefined_chunk_size = 100 # coordinates per request in batched lookups
+resolver_prefetch = True # look up the providers of pinned purls in batches in bulk mode
+resolver_workers = 8 # concurrent lookups in bulk mode
+server_host = '127.0.0.1'
+server_port = 8000
+server_file_directories = None # directories read by /file, None for the working directory
+cache_server_port = 8001 # see cache_server.py
+http_retries = 3 # retries on connection errors and 429, 5xx responses
+http_backoff_factor = 0.5 # seconds, doubled for each retry
+http_pool_size = 4 # kept-alive connections per host
+http_pool_sizes = {
+    'raw.githubusercontent.com': 16,
+    'pypi.org': 8,
+    'rubygems.org': 8,
+    'api.clearlydefined.io': 8,
+    'public.purldb.io': 8,
+    'repo1.maven.org': 8,
+}
+
+# cache entries expire after (seconds, None for never):
+# * text: license text results, replaced when scancode or foss-flame is updated
+# * pinned: urls and purls with a version, tag or commit
+# * latest: urls and purls without version, e.g. a purl for the latest version
+# * http: downloaded content, revalidated when the cache is updated
+# * miss: failed downloads (see negative_cache_codes), retried when the cache is updated
+# * provider: provider data looked up in batches (see resolver.py), not used when the cache is updated
+# * error: downloads failing with a connection error or timeout
+cache_ttls = {
+    'text': None,
+    'pinned': 30 * 24 * 3600,
+    'latest': 24 * 3600,
+    'http': 30 * 24 * 3600,
+    'miss': 6 * 3600,
+    'provider': 24 * 3600,
+    'error': 10 * 60,
+}
+# responses remembered as failed downloads, together with connection errors
+negative_cache_codes = [404, 410]
+cache_size_limit = 2 ** 30 # bytes
+cache_eviction_policy = 'least-recently-stored'
+cache_statistics = True # count cache hits and misses
+# where to cache, None for the user's cache directory (see cache_backend.py)
+cache_url = None
+cache_sqlite_timeout = 30 # seconds to wait for other writers
+cache_connect_timeout = 1 # seconds to connect to a cache server (see cache_backend.py)
+
+# load the foss-flame license database from a snapshot (pickle),
+# written in the cache directory at first use, instead of from its
+# JSON files
+flame_snapshot = False
+
+# when streaming, license files are read and matched in windows of
+# stream_window_lines lines, each window overlapping the previous one
+# by stream_overlap_lines lines (longer than e.g. the GPL-3.0 text)
+stream_window_lines = 2000
+stream_overlap_lines = 700
 
 module_name = 'lookup_license'
 
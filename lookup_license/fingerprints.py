@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+#
+# Fingerprints (digests of normalized texts) of known license texts,
+# used to identify verbatim copies of license texts without using
+# the scancode matcher.
+#
+# The fingerprints map to scancode license keys, normalized the same
+# way as the keys found by the scancode matcher. They are precomputed,
+# stored in data/license-fingerprints.json and only used with the
+# scancode version they were built with. To regenerate the file:
+#
+#    PYTHONPATH=. python3 -m lookup_license.fingerprints tests/licenses
+#
+
+import glob
+import json
+import logging
+import os
+import re
+import sys
+
+from lookup_license.utils import normalize_text
+from lookup_license.utils import text_digest
+
+SCRIPT_DIR = os.path.dirname(__file__)
+LOOKUP_LICENSE_DATA_DIR = os.path.join(SCRIPT_DIR, 'data')
+LOOKUP_LICENSE_FINGERPRINTS_FILE = os.path.join(LOOKUP_LICENSE_DATA_DIR, 'license-fingerprints.json')
+
+# copyright statements differ between otherwise identical license texts
+COPYRIGHT_LINE_RE = re.compile(r'^\W*(copyright\b|\(c\))', re.IGNORECASE)
+
+fingerprints = None
+
+def fingerprint(text):
+    lines = [line for line in text.splitlines() if not COPYRIGHT_LINE_RE.match(line)]
+    return text_digest('\n'.join(lines))
+
+def scancode_version():
+    try:
+        import scancode_config # noqa: I900
+        return scancode_config.__version__
+    except Exception:
+        return 'unknown'
+
+def _read_fingerprints():
+    try:
+        with open(LOOKUP_LICENSE_FINGERPRINTS_FILE) as fp:
+            data = json.load(fp)
+    except Exception as e:
+        logging.warning(f'Could not read license fingerprints from {LOOKUP_LICENSE_FINGERPRINTS_FILE}: {e}')
+        return {}
+
+    if data['scancode_version'] != scancode_version():
+        logging.info(f'Ignoring {LOOKUP_LICENSE_FINGERPRINTS_FILE}, built with scancode {data["scancode_version"]} (using {scancode_version()})')
+        return {}
+
+    return data['fingerprints']
+
+def lookup_fingerprint(text):
+    # returns the scancode license key of a verbatim license text, or None
+    global fingerprints
+    if fingerprints is None:
+        fingerprints = _read_fingerprints()
+    return fingerprints.get(fingerprint(text))
+
+def _add_fingerprint(found, text, license_key):
+    if not normalize_text(text):
+        return
+    found.setdefault(fingerprint(text), set()).add(license_key)
+
+def build_fingerprints(license_dirs=None):
+    from licensedcode import cache # noqa: I900
+
+    found = {}
+    scancode_keys = {}
+    for lic in cache.get_licenses_db().values():
+        if lic.text and lic.spdx_license_key:
+            _add_fingerprint(found, lic.text, lic.key)
+            scancode_keys[lic.spdx_license_key] = lic.key
+
+    # license files named <spdx id>.LICENSE, e.g. tests/licenses/MIT.LICENSE
+    for license_dir in license_dirs or []:
+        for license_file in glob.glob(os.path.join(license_dir, '*.LICENSE')):
+            spdx_key = os.path.basename(license_file).replace('.LICENSE', '')
+            if spdx_key not in scancode_keys:
+                logging.info(f'Ignoring {license_file}, no scancode license key for {spdx_key}')
+                continue
+            with open(license_file) as fp:
+                _add_fingerprint(found, fp.read(), scancode_keys[spdx_key])
+
+    # a text identifying more than one license is not a fingerprint
+    ambiguous = [key for key, licenses in found.items() if len(licenses) > 1]
+    for key in ambiguous:
+        logging.info(f'Ignoring ambiguous fingerprint {key}: {found[key]}')
+        del found[key]
+
+    return {
+        'scancode_version': scancode_version(),
+        'fingerprints': {key: licenses.pop() for key, licenses in sorted(found.items())},
+    }
+
+def main():
+    data = build_fingerprints(sys.argv[1:])
+    with open(LOOKUP_LICENSE_FINGERPRINTS_FILE, 'w') as fp:
+        json.dump(data, fp, indent=0)
+    print(f'{len(data["fingerprints"])} fingerprints written to {LOOKUP_LICENSE_FINGERPRINTS_FILE}')
+
+
+if __name__ == '__main__':
+    main()
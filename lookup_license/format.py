@@ -30,7 +30,7 @@ class Formatter:
     def format_error(self, exception, verbose=False):
         return None, None
 
-    def format_cache(self, entries, verbose=False):
+    def format_cache(self, entries, verbose=False, stats=None):
         return None, None
 
     def format_lookup_urls(self, looked_up_urls, verbose=False):
@@ -47,8 +47,10 @@ class JsonFormatter(Formatter):
     def format_resources(self, resources, verbose=False):
         return json.dumps(resources, indent=4)
 
-    def format_cache(self, entries, verbose=False):
-        return json.dumps(entries), None
+    def format_cache(self, entries, verbose=False, stats=None):
+        if stats is None:
+            return json.dumps(entries), None
+        return json.dumps({'entries': entries, 'statistics': stats}), None
 
     def format_lookup_urls(self, looked_up_urls, verbose=False):
         return json.dumps(looked_up_urls, indent=4), None
@@ -98,8 +100,14 @@ class TextFormatter(Formatter):
             return '<no license found>'
         return lic
 
-    def format_cache(self, entries, verbose=False):
-        return '\n'.join(list(entries)), None
+    def format_cache(self, entries, verbose=False, stats=None):
+        ret = list(entries)
+        if stats is not None:
+            if ret:
+                ret.append('')
+            ret.append('Statistics:')
+            ret += [f' * {key}: {value}' for key, value in stats.items()]
+        return '\n'.join(ret), None
 
     def _format_resource_add(self, title, items, store):
         sep = '\n * '
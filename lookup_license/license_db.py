@@ -2,20 +2,98 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from flame.license_db import FossLicenses # noqa: I900
-from flame.license_db import Validation # noqa: I900
+from lookup_license.cache import cache_location
+from lookup_license.license_names import flame_data_digest
+from lookup_license.license_names import flame_version
+from lookup_license.license_names import lookup_license_name
+
+import lookup_license.config
+
+from cachetools import LRUCache
+from cachetools import cached
+
+import copy
+import logging
+import os
+import pickle
+import threading
+
+MAX_CACHE_SIZE = 10000
+
+def flame_snapshot_file():
+    return os.path.join(cache_location(), f'flame-{flame_version()}-{flame_data_digest()[:16]}.pickle')
+
+def _read_flame_snapshot(snapshot_file):
+    try:
+        with open(snapshot_file, 'rb') as fp:
+            return pickle.load(fp)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.info(f'Could not read foss-flame snapshot {snapshot_file}: {e}')
+        return None
+
+def _write_flame_snapshot(snapshot_file, fl):
+    try:
+        os.makedirs(os.path.dirname(snapshot_file), exist_ok=True)
+        tmp_file = f'{snapshot_file}.{os.getpid()}'
+        with open(tmp_file, 'wb') as fp:
+            pickle.dump(fl, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, snapshot_file)
+    except Exception as e:
+        logging.info(f'Could not write foss-flame snapshot {snapshot_file}: {e}')
+
+def _load_foss_licenses():
+    from flame.license_db import FossLicenses # noqa: I900
+    if not lookup_license.config.flame_snapshot:
+        return FossLicenses()
+
+    # the snapshot file name contains the foss-flame version and a
+    # digest of its license data, so a snapshot of other data is never used
+    snapshot_file = flame_snapshot_file()
+    fl = _read_flame_snapshot(snapshot_file)
+    if fl is None:
+        fl = FossLicenses()
+        _write_flame_snapshot(snapshot_file, fl)
+    return fl
 
 class LicenseDatabase:
 
-    fl = FossLicenses()
+    # the foss-flame database, loaded when first used
+    _fl = None
+    _fl_lock = threading.Lock()
+
+    @staticmethod
+    def foss_licenses():
+        with LicenseDatabase._fl_lock:
+            if LicenseDatabase._fl is None:
+                logging.debug('Initializing foss-flame license database')
+                LicenseDatabase._fl = _load_foss_licenses()
+        return LicenseDatabase._fl
+
+    @staticmethod
+    def warm():
+        # load the database and prepare the expression matching
+        # (done by foss-flame at the first lookup) now
+        LicenseDatabase.foss_licenses().expression_license('MIT', update_dual=False)
 
     @staticmethod
     def expression_license(expr):
-        return LicenseDatabase.fl.expression_license(expr, update_dual=False)
+        # the cached result is shared, hand out a copy
+        return copy.deepcopy(LicenseDatabase._expression_license(expr))
 
     @staticmethod
     def expression_license_identified(expr):
-        return LicenseDatabase.fl.expression_license(expr, update_dual=False)['identified_license']
+        return LicenseDatabase._expression_license(expr)['identified_license']
+
+    @staticmethod
+    @cached(cache=LRUCache(maxsize=MAX_CACHE_SIZE), lock=threading.Lock(), info=True)
+    def _expression_license(expr):
+        # most license names are known beforehand, see license_names.py
+        normalized = lookup_license_name(expr)
+        if normalized:
+            return normalized
+        return LicenseDatabase.foss_licenses().expression_license(expr, update_dual=False)
 
     @staticmethod
     def summarize_license(licenses):
@@ -30,8 +108,21 @@ class LicenseDatabase:
     def simplify(expr):
         if not expr:
             return ''
-        return LicenseDatabase.fl.simplify([expr])
+        return LicenseDatabase.foss_licenses().simplify([expr])
 
     @staticmethod
     def validate(expr):
-        return LicenseDatabase.fl.expression_license(expr, validations=[Validation.SPDX], update_dual=False)
+        return copy.deepcopy(LicenseDatabase._validate(expr))
+
+    @staticmethod
+    @cached(cache=LRUCache(maxsize=MAX_CACHE_SIZE), lock=threading.Lock(), info=True)
+    def _validate(expr):
+        from flame.license_db import Validation # noqa: I900
+        return LicenseDatabase.foss_licenses().expression_license(expr, validations=[Validation.SPDX], update_dual=False)
+
+    @staticmethod
+    def cache_info():
+        return {
+            'expression_license': LicenseDatabase._expression_license.cache_info()._asdict(),
+            'validate': LicenseDatabase._validate.cache_info()._asdict(),
+        }
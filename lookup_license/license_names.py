@@ -0,0 +1,151 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+#
+# Precomputed foss-flame normalizations of all license names known to
+# foss-flame (SPDX identifiers, aliases and PyPI Trove classifiers),
+# used to skip expression parsing for the most common license names.
+#
+# The table is stored in data/license-names.json.gz and is only used
+# with the foss-flame version, and license data files, it was built
+# with. With other foss-flame data the names are normalized by
+# foss-flame, while the table is rebuilt (in a thread of its own) in
+# the cache directory. To regenerate the file:
+#
+#    PYTHONPATH=. python3 -m lookup_license.license_names
+#
+
+import gzip
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import threading
+
+import lookup_license.cache
+
+SCRIPT_DIR = os.path.dirname(__file__)
+LOOKUP_LICENSE_DATA_DIR = os.path.join(SCRIPT_DIR, 'data')
+LOOKUP_LICENSE_NAMES_FILE = os.path.join(LOOKUP_LICENSE_DATA_DIR, 'license-names.json.gz')
+
+license_names = None
+rebuild_thread = None
+_flame_data_digest = None
+
+def flame_version():
+    from importlib.metadata import version
+    try:
+        return version('foss-flame')
+    except Exception:
+        return 'unknown'
+
+def flame_data_digest():
+    # a digest of the license data files of foss-flame, which may
+    # change without the version changing (e.g. installed from git)
+    global _flame_data_digest
+    if _flame_data_digest is None:
+        digest = hashlib.sha256()
+        spec = importlib.util.find_spec('flame')
+        if spec and spec.submodule_search_locations:
+            data_dir = os.path.join(list(spec.submodule_search_locations)[0], 'var')
+            for root, dirs, files in os.walk(data_dir):
+                dirs.sort()
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    digest.update(os.path.relpath(path, data_dir).encode('utf-8'))
+                    with open(path, 'rb') as fp:
+                        digest.update(fp.read())
+        _flame_data_digest = digest.hexdigest()
+    return _flame_data_digest
+
+def rebuilt_license_names_file():
+    return os.path.join(lookup_license.cache.cache_location(), f'license-names-{flame_data_digest()[:16]}.json.gz')
+
+def _read_license_names_file(path):
+    try:
+        with gzip.open(path, 'rt') as fp:
+            return json.load(fp)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f'Could not read license names from {path}: {e}')
+        return None
+
+def _current(data):
+    return data.get('flame_version') == flame_version() and data.get('flame_data') == flame_data_digest()
+
+def _read_license_names():
+    for path in [LOOKUP_LICENSE_NAMES_FILE, rebuilt_license_names_file()]:
+        data = _read_license_names_file(path)
+        if data and _current(data):
+            return data['license_names']
+
+    logging.info(f'Ignoring {LOOKUP_LICENSE_NAMES_FILE}, not built with the installed foss-flame {flame_version()}, rebuilding it')
+    _start_rebuild()
+    return {}
+
+def _rebuild_license_names(path):
+    global license_names
+    try:
+        from flame.license_db import FossLicenses # noqa: I900
+        data = build_license_names(FossLicenses())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_file = f'{path}.{os.getpid()}'
+        with gzip.open(tmp_file, 'wt') as fp:
+            json.dump(data, fp)
+        os.replace(tmp_file, path)
+    except Exception as e:
+        logging.info(f'Could not rebuild license names in {path}: {e}')
+        return
+    logging.debug(f'{len(data["license_names"])} license names rebuilt in {path}')
+    license_names = data['license_names']
+
+def _start_rebuild():
+    # the names are normalized by foss-flame until the table is rebuilt
+    global rebuild_thread
+    if rebuild_thread:
+        return
+    rebuild_thread = threading.Thread(target=_rebuild_license_names, args=(rebuilt_license_names_file(),),
+                                      name='lookup-license-names', daemon=True)
+    rebuild_thread.start()
+
+def lookup_license_name(name):
+    global license_names
+    if license_names is None:
+        license_names = _read_license_names()
+    normalized = license_names.get(name)
+    if not normalized:
+        return None
+    # the queried name is not stored in the table
+    return dict({'queried_license': name}, **normalized)
+
+def build_license_names(fl):
+    names = set(fl.license_db['aliases']) | set(fl.license_db['licenses'])
+    normalized = {}
+    for name in sorted(names):
+        try:
+            result = fl.expression_license(name, update_dual=False)
+        except Exception as e:
+            logging.info(f'Ignoring license name "{name}": {e}')
+            continue
+        del result['queried_license']
+        normalized[name] = result
+
+    return {
+        'flame_version': flame_version(),
+        'flame_data': flame_data_digest(),
+        'license_names': normalized,
+    }
+
+def main():
+    from flame.license_db import FossLicenses # noqa: I900
+    data = build_license_names(FossLicenses())
+    with gzip.open(LOOKUP_LICENSE_NAMES_FILE, 'wt') as fp:
+        json.dump(data, fp)
+    print(f'{len(data["license_names"])} license names written to {LOOKUP_LICENSE_NAMES_FILE}')
+
+
+if __name__ == '__main__':
+    main()
@@ -8,8 +8,6 @@ from lookup_license.lookuplicense import LookupLicense
 from lookup_license.lookuplicense import LicenseTextReader
 from lookup_license.format import FormatterFactory
 
-ll = LookupLicense()
-
 class LookupLicenseShell(cmd.Cmd):
     intro = 'Welcome to the LookupLicense shell. Type help or ? to list commands.\n'
     prompt = '>>> '
@@ -18,6 +16,7 @@ class LookupLicenseShell(cmd.Cmd):
     def __init__(self, verbose=False):
         cmd.Cmd.__init__(self)
         self.verbose_mode = verbose
+        self.ll = LookupLicense()
         self.license_reader = None
         self.formatter = None
 
@@ -49,7 +48,7 @@ class LookupLicenseShell(cmd.Cmd):
         license_text = self.license_reader.read_license_text()
         self.verbose(f'read {len(license_text)} characters, looking up the license')
         try:
-            result = ll.lookup_license_text(license_text)
+            result = self.ll.lookup_license_text(license_text)
             self.__output_result(result)
         except Exception as e:
             self.__handle_error(e)
@@ -61,7 +60,7 @@ class LookupLicenseShell(cmd.Cmd):
         filename = self.license_reader.read_license_file()
         self.verbose(f'Read {filename}, looking up the license')
         try:
-            result = ll.lookup_license_file(filename)
+            result = self.ll.lookup_license_file(filename)
             self.__output_result(result)
         except Exception as e:
             self.__handle_error(e)
@@ -73,7 +72,7 @@ class LookupLicenseShell(cmd.Cmd):
         url = self.license_reader.read_license_url()
         self.verbose(f'Read {url}, looking up the license')
         try:
-            result = ll.lookup_license_url(url)
+            result = self.ll.lookup_license_url(url)
             self.__output_result(result)
         except Exception as e:
             self.__handle_error(e)
@@ -85,7 +84,7 @@ class LookupLicenseShell(cmd.Cmd):
         url = self.license_reader.read_license_url()
         self.verbose(f'Read {url}, looking up the license')
         try:
-            result = ll.lookup_github_url(url)
+            result = self.ll.lookup_github_url(url)
             self.__output_result(result)
         except Exception as e:
             self.__handle_error(e)
@@ -0,0 +1,157 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+#
+# Read the packages (as purls) from lockfiles and similar files:
+#
+# * pip: requirements.txt, poetry.lock
+# * gem: Gemfile.lock
+# * go: go.mod, go.sum
+# * maven: output from "mvn dependency:list"
+#
+
+import logging
+import os
+import re
+
+def pypi_purl(name, version=None):
+    # https://peps.python.org/pep-0503/#normalized-names
+    name = re.sub(r'[-_.]+', '-', name).lower()
+    if version:
+        return f'pkg:pypi/{name}@{version}'
+    return f'pkg:pypi/{name}'
+
+def gem_purl(name, version):
+    return f'pkg:gem/{name}@{version}'
+
+def go_purl(module, version):
+    return f'pkg:golang/{module}@{version}'
+
+def maven_purl(group, artifact, version):
+    return f'pkg:maven/mavencentral/{group}/{artifact}@{version}'
+
+def requirements_purls(lines):
+    for line in lines:
+        # remove comments, environment markers and hashes
+        line = line.split('#')[0].split(';')[0].split('--hash')[0].strip().rstrip('\\').strip()
+        if not line or line.startswith('-'):
+            continue
+        match = re.match(r'^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*(==\s*([^\s,]+))?', line)
+        if not match:
+            logging.debug(f'requirements: ignoring "{line}"')
+            continue
+        yield pypi_purl(match.group(1), match.group(4))
+
+def poetry_purls(lines):
+    name = None
+    version = None
+    in_package = False
+    for line in lines:
+        line = line.strip()
+        if line.startswith('['):
+            if name and version:
+                yield pypi_purl(name, version)
+            name = None
+            version = None
+            in_package = line == '[[package]]'
+            continue
+        if not in_package:
+            continue
+        match = re.match(r'^(name|version)\s*=\s*"([^"]*)"', line)
+        if match and match.group(1) == 'name':
+            name = match.group(2)
+        elif match:
+            version = match.group(2)
+    if name and version:
+        yield pypi_purl(name, version)
+
+def gemfile_lock_purls(lines):
+    in_specs = False
+    for line in lines:
+        line = line.rstrip()
+        if line.strip() == 'specs:':
+            in_specs = True
+            continue
+        if not line.startswith(' '):
+            in_specs = False
+            continue
+        # the gems are indented 4 spaces, their dependencies 6
+        match = re.match(r'^    ([^ ]+) \(([^)]+)\)$', line)
+        if in_specs and match:
+            yield gem_purl(match.group(1), match.group(2))
+
+def go_mod_purls(lines):
+    in_require = False
+    for line in lines:
+        line = line.split('//')[0].strip()
+        if line.startswith('require ('):
+            in_require = True
+            continue
+        if in_require and line == ')':
+            in_require = False
+            continue
+        if line.startswith('require '):
+            line = line.replace('require ', '', 1).strip()
+        elif not in_require:
+            continue
+        splits = line.split()
+        if len(splits) == 2:
+            yield go_purl(splits[0], splits[1])
+
+def go_sum_purls(lines):
+    for line in lines:
+        splits = line.split()
+        # modules only listed with the hash of their go.mod are not built
+        if len(splits) == 3 and not splits[1].endswith('/go.mod'):
+            yield go_purl(splits[0], splits[1])
+
+def maven_dependency_list_purls(lines):
+    # e.g. "[INFO]    org.apache.commons:commons-lang3:jar:3.12.0:compile"
+    for line in lines:
+        line = line.replace('[INFO]', '').strip()
+        if not line:
+            continue
+        splits = line.split()[0].split(':')
+        if len(splits) == 5:
+            group, artifact, _, version, _ = splits
+        elif len(splits) == 6:
+            group, artifact, _, _, version, _ = splits
+        else:
+            continue
+        yield maven_purl(group, artifact, version)
+
+
+LOCKFILE_PARSERS = {
+    'requirements': requirements_purls,
+    'poetry.lock': poetry_purls,
+    'Gemfile.lock': gemfile_lock_purls,
+    'go.mod': go_mod_purls,
+    'go.sum': go_sum_purls,
+    'maven': maven_dependency_list_purls,
+}
+
+def lockfile_type(lockfile):
+    name = os.path.basename(lockfile)
+    if name in LOCKFILE_PARSERS:
+        return name
+    if name.startswith('requirements') and name.endswith('.txt'):
+        return 'requirements'
+    with open(lockfile) as fp:
+        if 'The following files have been resolved' in fp.read(65536):
+            return 'maven'
+    raise Exception(f'Could not identify the type of lockfile {lockfile}, supported lockfiles are: requirements*.txt, poetry.lock, Gemfile.lock, go.mod, go.sum and the output from "mvn dependency:list".')
+
+def lockfile_purls(lockfile):
+    parser = LOCKFILE_PARSERS[lockfile_type(lockfile)]
+    with open(lockfile) as fp:
+        yield from parser(fp)
+
+def lockfiles_purls(lockfiles):
+    # the purls in all the lockfiles, each purl once
+    seen = set()
+    for lockfile in lockfiles:
+        for purl in lockfile_purls(lockfile):
+            if purl not in seen:
+                seen.add(purl)
+                yield purl
@@ -4,17 +4,24 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from licensedcode import cache # noqa: I900
 from cachetools import LFUCache
 from cachetools import cached
+import copy
 import logging
+import os
+import threading
 import traceback
 
 # from flame.license_db import FossLicenses # noqa: I900
 # from flame.license_db import Validation # noqa: I900
 
 import lookup_license.config
+from lookup_license.cache import LookupLicenseCache
+from lookup_license.cache import TEXT_CACHE_PREFIX
+from lookup_license.fingerprints import lookup_fingerprint
 from lookup_license.license_db import LicenseDatabase
+from lookup_license.license_names import flame_version
+from lookup_license.utils import text_digest
 
 # from lookup_license.lookupurl import LookupURL # noqa: I900
 
@@ -25,6 +32,7 @@ MIN_LICENSE_LENGTH = 200
 MAIN_BRANCHES = ['main', 'master']
 LICENSE_FILES = ['LICENSE', 'LICENSE.txt', 'COPYING']
 
+
 class LicenseCache(LFUCache):
 
     def popitem(self):
@@ -32,6 +40,36 @@ class LicenseCache(LFUCache):
         logging.debug(f'Remove cached license item: {key}')
         return key, value
 
+
+# results from lookup_license_text, shared by all LookupLicense objects
+text_cache = LicenseCache(maxsize=MAX_CACHE_SIZE)
+text_cache_lock = threading.Lock()
+_index_version = None
+
+# the scancode license index, shared by all LookupLicense objects
+# (and by processes forked after it has been loaded)
+license_index = None
+license_index_lock = threading.Lock()
+
+def get_license_index():
+    global license_index
+    with license_index_lock:
+        if not license_index:
+            logging.debug("Initializing license index")
+            from licensedcode import cache # noqa: I900
+            license_index = cache.get_index()
+            logging.debug("Initializing license index finished")
+    return license_index
+
+# identifies the scancode index and the foss-flame database, used
+# to invalidate cached license text results when any of them change
+def license_index_version():
+    global _index_version
+    if not _index_version:
+        import scancode_config # noqa: I900
+        _index_version = f'scancode-{scancode_config.__version__}-flame-{flame_version()}'
+    return _index_version
+
 class LicenseTextReader():
 
     def __init__(self):
@@ -79,9 +117,12 @@ class LookupLicense():
 
     def __init_license_index(self):
         if not self.idx:
-            logging.debug("Initializing license cache")
-            self.idx = cache.get_index()
-            logging.debug("Initializing license cache finished")
+            self.idx = get_license_index()
+
+    def warm(self):
+        # load the license index and database now, instead of at the first lookup
+        self.__init_license_index()
+        LicenseDatabase.warm()
 
     def __flame_status(self, res):
         return len(res['ambiguities']) == 0
@@ -120,8 +161,116 @@ class LookupLicense():
             new = url.replace('/src/', '/raw/')
             return new
 
-#    @cached(cache=LicenseCache(maxsize=MAX_CACHE_SIZE), info=True)
+    def __text_cache_key(self, license_text, minimum_score):
+        # license names are looked up as is, by foss-flame, long texts
+        # are matched by scancode ignoring case and whitespace. A short
+        # text may read the same as a long text once folded, so the path
+        # is part of the key
+        fold_case = len(license_text) >= MIN_LICENSE_LENGTH
+        path = 'scancode' if fold_case else 'flame'
+        return (path, fold_case, text_digest(license_text, fold_case), minimum_score)
+
+    def __disk_cache_key(self, key):
+        path, fold_case, digest, minimum_score = key
+        folding = 'folded' if fold_case else 'exact'
+        return f'{TEXT_CACHE_PREFIX}:{license_index_version()}:{path}:{folding}:{digest}:{minimum_score}'
+
+    def __cached_result(self, key):
+        # returns a copy, so callers can not change the cached result
+        with text_cache_lock:
+            result = text_cache.get(key)
+        if result is not None:
+            return copy.deepcopy(result)
+        try:
+            result = LookupLicenseCache().get(self.__disk_cache_key(key))
+        except Exception as e:
+            logging.debug(f'lookup_license_text: failed to get data from cache, {e}')
+            return None
+        if result is None:
+            return None
+        with text_cache_lock:
+            text_cache[key] = result
+        return copy.deepcopy(result)
+
+    def __store_result(self, key, result):
+        result = copy.deepcopy(result)
+        with text_cache_lock:
+            text_cache[key] = result
+        LookupLicenseCache().add(self.__disk_cache_key(key), result)
+
     def lookup_license_text(self, license_text, minimum_score=lookup_license.config.default_minimum_score):
+        key = self.__text_cache_key(license_text, minimum_score)
+        result = self.__cached_result(key)
+        if not result:
+            result = self.__lookup_license_text(license_text, minimum_score)
+            # the provided text is added back below, no need to store it
+            result['provided'] = None
+            self.__store_result(key, result)
+
+        return dict(result, provided=license_text)
+
+    def lookup_license_texts(self, license_texts, minimum_score=lookup_license.config.default_minimum_score, processes=None, ordered=True):
+        # yields (index, result) tuples, index being the position of
+        # the license text in license_texts. With ordered=False the
+        # results are yielded as soon as they are available.
+        license_texts = list(license_texts)
+
+        # identical texts are looked up once
+        key_indexes = {}
+        key_texts = {}
+        for index, license_text in enumerate(license_texts):
+            key = self.__text_cache_key(license_text, minimum_score)
+            key_indexes.setdefault(key, []).append(index)
+            key_texts.setdefault(key, license_text)
+
+        # cached results, license names and verbatim license texts
+        # are looked up in this process, the rest is matched by scancode
+        results = {}
+        match_keys = []
+        for key, license_text in key_texts.items():
+            result = self.__cached_result(key)
+            if not result and (len(license_text) < MIN_LICENSE_LENGTH or lookup_fingerprint(license_text)):
+                result = self.lookup_license_text(license_text, minimum_score)
+            if result:
+                results[key] = result
+            else:
+                match_keys.append(key)
+
+        if not ordered:
+            for key, result in results.items():
+                for index in key_indexes[key]:
+                    yield index, dict(copy.deepcopy(result), provided=license_texts[index])
+
+        for key, result in self.__match_license_texts(match_keys, key_texts, minimum_score, processes):
+            results[key] = result
+            if not ordered:
+                for index in key_indexes[key]:
+                    yield index, dict(copy.deepcopy(result), provided=license_texts[index])
+
+        if ordered:
+            for index, license_text in enumerate(license_texts):
+                key = self.__text_cache_key(license_text, minimum_score)
+                # identical texts get results of their own
+                yield index, dict(copy.deepcopy(results[key]), provided=license_text)
+
+    def __match_license_texts(self, keys, key_texts, minimum_score, processes):
+        # yields (key, result) tuples in the order they are matched,
+        # using no more workers than texts
+        processes = min(processes or os.cpu_count() or 1, len(keys))
+        if processes < 2:
+            for key in keys:
+                yield key, self.lookup_license_text(key_texts[key], minimum_score)
+            return
+
+        from lookup_license.pool import LookupLicensePool
+        with LookupLicensePool(processes) as pool:
+            texts = [key_texts[key] for key in keys]
+            for index, result in pool.lookup_license_texts(texts, minimum_score, ordered=False):
+                # the workers' in-process caches are gone with the pool
+                self.__store_result(keys[index], dict(result, provided=None))
+                yield keys[index], result
+
+    def __lookup_license_text(self, license_text, minimum_score):
         # if short license text, it is probably a license name
         # try normalizing with foss-flame
         if len(license_text) < MIN_LICENSE_LENGTH:
@@ -140,6 +289,22 @@ class LookupLicense():
                 logging.debug(traceback.format_exc)
 
         # either we have a long license text or foss-flame normalization failed
+        # check if the text is a verbatim copy of a known license text
+        license_key = lookup_fingerprint(license_text)
+        if license_key:
+            license_name = LicenseDatabase.expression_license(license_key)['identified_license']
+            return {
+                "identification": "lookup-license",
+                "provided": license_text,
+                "normalized": [
+                    {
+                        "license": license_name,
+                        "score": 100.0,
+                    }],
+                "ambiguities": 0,
+                "status": True,
+            }
+
         # proceed with "our" lookup
         self.__init_license_index()
         ret = self.idx.match(
@@ -171,12 +336,101 @@ class LookupLicense():
             "status": True,
         }
 
-    def lookup_license_file(self, license_file):
-        self.__init_license_index()
+    def lookup_license_file(self, license_file, stream=False):
+        # streaming keeps memory usage down for large files (e.g.
+        # THIRD-PARTY-NOTICES) but matching the overlapping windows
+        # takes more time than matching the entire file at once
+        if stream:
+            return self.__lookup_license_file_streamed(license_file)
         with open(license_file) as fp:
             content = fp.read()
             return self.lookup_license_text(content)
 
+    def __lookup_license_file_streamed(self, license_file):
+        identified_licenses = list(self.lookup_license_file_stream(license_file))
+        # sort lowest score first, as in lookup_license_text
+        identified_licenses.sort(key=lambda x: x['score'])
+        return {
+            "identification": "lookup-license",
+            "provided": license_file,
+            "normalized": identified_licenses,
+            "ambiguities": 0,
+            "status": True,
+        }
+
+    def __license_file_windows(self, license_file, window_lines, overlap_lines):
+        # yields (window, first line number, last window)
+        window = []
+        first_line = 1
+        new_lines = 0
+        with open(license_file) as fp:
+            for line in fp:
+                if len(window) == window_lines:
+                    yield ''.join(window), first_line, False
+                    window = window[window_lines - overlap_lines:]
+                    first_line += window_lines - overlap_lines
+                    new_lines = 0
+                window.append(line)
+                new_lines += 1
+        if new_lines:
+            yield ''.join(window), first_line, True
+
+    def lookup_license_file_stream(self, license_file,
+                                   minimum_score=lookup_license.config.default_minimum_score,
+                                   window_lines=lookup_license.config.stream_window_lines,
+                                   overlap_lines=lookup_license.config.stream_overlap_lines,
+                                   stable_windows=None):
+        # yields the licenses found in license_file, as found, one
+        # window at a time. Stops after stable_windows consecutive
+        # windows without new licenses, if stable_windows is set.
+        if overlap_lines >= window_lines:
+            raise Exception(f'Overlap ({overlap_lines} lines) must be smaller than the window ({window_lines} lines)')
+
+        self.__init_license_index()
+        found = set()
+        matched_lines = []
+        unchanged_windows = 0
+        for window, first_line, last_window in self.__license_file_windows(license_file, window_lines, overlap_lines):
+            ret = self.idx.match(
+                query_string=window,
+                min_score=MIN_SCORE,
+                unknown_licenses=False,
+            )
+            unchanged_windows += 1
+            window_matched_lines = []
+            for s in sorted([r.to_dict() for r in ret], key=lambda x: x['start_line']):
+                # a match starting in the overlap is matched
+                # (in full) in the next window
+                if not last_window and s['start_line'] > window_lines - overlap_lines:
+                    continue
+                # a match overlapping an earlier match is the rest
+                # of a license text matched in the previous window
+                start = first_line + s['start_line'] - 1
+                end = first_line + s['end_line'] - 1
+                if any(start <= matched_end and end >= matched_start for matched_start, matched_end in matched_lines):
+                    continue
+                window_matched_lines.append((start, end))
+
+                if s['score'] < minimum_score:
+                    continue
+                license_name = LicenseDatabase.expression_license(s['license_expression'])['identified_license']
+                if license_name in found:
+                    continue
+                found.add(license_name)
+                unchanged_windows = 0
+                yield {
+                    "license": license_name,
+                    "score": s['score'],
+                }
+
+            # only matches reaching into the overlap can overlap the coming windows
+            next_first_line = first_line + window_lines - overlap_lines
+            matched_lines = [x for x in matched_lines + window_matched_lines if x[1] >= next_first_line]
+
+            if stable_windows and unchanged_windows >= stable_windows:
+                logging.debug(f'lookup_license_file_stream: no new licenses in {unchanged_windows} windows, stopping')
+                return
+
     @cached(cache=LicenseCache(maxsize=MAX_CACHE_SIZE), info=True)
     def OBSOLETE_lookup_gitrepo_url_shallow(self, url):
         lookup_url = None
@@ -244,6 +498,10 @@ class LookupLicense():
 
         return res
 
+    def validate(self, expr):
+        # raises an exception if expr is not a valid SPDX license expression
+        return LicenseDatabase.validate(expr)
+
     def list_resources(self):
         from lookup_license.lookupurl.license_providers import LicenseProviders
         license_providers = LicenseProviders().providers()
@@ -5,16 +5,25 @@
 # from purltools import purl2clearlydefined  # noqa: I900
 from lookup_license.lookupurl.purl2cd import purl2clearlydefined
 
+from lookup_license.cache import LookupLicenseCache
+from lookup_license.cache import PROVIDER_CACHE_PREFIX
 from lookup_license.lookupurl.license_provider import LicenseProvider
 from lookup_license.retrieve import Retriever
+from lookup_license.retrieve import http_session
 
+from concurrent.futures import ThreadPoolExecutor
 import json
 import logging
 
+import lookup_license.config
+
 LICENSE_EXPRESSION_PATH = 'licensed.facets.core.discovered.expressions'
 
 class ClearlyDefined(LicenseProvider):
 
+    def __init__(self, api_url=None):
+        self.api_url = (api_url or lookup_license.config.clearlydefined_api_url).rstrip('/')
+
     def name(self):
         return 'https://clearlydefined.io'
 
@@ -25,12 +34,11 @@ class ClearlyDefined(LicenseProvider):
         logging.debug(f'{self.__class__.__name__}:purl_to_coordinate_url {purl}')
         coord = purl2clearlydefined(purl)
         logging.debug(f'{self.__class__.__name__}:purl_to_coordinate_url {purl} => coord: {coord}')
-        coord_url = f'https://api.clearlydefined.io/definitions/{coord}'
+        coord_url = f'{self.api_url}/definitions/{coord}'
         logging.debug(f'{self.__class__.__name__}:purl_to_coordinate_url {purl} => coord: {coord} => {coord_url}')
         return coord_url
 
-    def parameters_to_url(self, pkg_type, pkg_namespace, pkg_name, pkg_version, pkg_qualifiers=None, pkg_subpath=None):
-        logging.debug(f'{self.__class__.__name__}:parameters_to_url {pkg_type}, {pkg_namespace}, {pkg_name}, {pkg_version}, {pkg_qualifiers}, {pkg_subpath}')
+    def parameters_to_coordinates(self, pkg_type, pkg_namespace, pkg_name, pkg_version):
         if pkg_version:
             pkg_version_str = f'/{pkg_version}'
         else:
@@ -41,8 +49,12 @@ class ClearlyDefined(LicenseProvider):
         else:
             pkg_namespace_str = '/-'
 
-        coordinates = f'{pkg_type}{pkg_namespace_str}/{pkg_name}{pkg_version_str}'
-        coord_url = f'https://api.clearlydefined.io/definitions/{coordinates}'
+        return f'{pkg_type}{pkg_namespace_str}/{pkg_name}{pkg_version_str}'
+
+    def parameters_to_url(self, pkg_type, pkg_namespace, pkg_name, pkg_version, pkg_qualifiers=None, pkg_subpath=None):
+        logging.debug(f'{self.__class__.__name__}:parameters_to_url {pkg_type}, {pkg_namespace}, {pkg_name}, {pkg_version}, {pkg_qualifiers}, {pkg_subpath}')
+        coordinates = self.parameters_to_coordinates(pkg_type, pkg_namespace, pkg_name, pkg_version)
+        coord_url = f'{self.api_url}/definitions/{coordinates}'
         logging.debug(f'{self.__class__.__name__}:parameters_to_url {pkg_type}, {pkg_namespace}, {pkg_name}, {pkg_version}, {pkg_qualifiers}, {pkg_subpath} => {coord_url}')
 
         return coord_url
@@ -64,33 +76,28 @@ class ClearlyDefined(LicenseProvider):
         else:
             coord_url = url
 
+        stored = self.__stored_result(coord_url) if coord_url else None
+        if stored:
+            # looked up in a batch (see lookup_license_packages)
+            return stored
+
         if coord_url:
             try:
                 retrieved_result = retriever.download_url(coord_url)
                 success = retrieved_result['success']
             except Exception:
                 success = False
-                error_msg = f'Coult not download {coord_url}.'
+                error_msg = f'Could not download {coord_url}.'
         else:
             success = False
-            error_msg = f'Coult not convert {url} to a coordinate.'
+            error_msg = f'Could not convert {url} to a coordinate.'
 
         if not success:
             identified_license = None
         else:
             decoded_content = retrieved_result['decoded_content']
             json_data = json.loads(decoded_content)
-
-            try:
-                inner_json = json_data
-                for key in LICENSE_EXPRESSION_PATH.split('.'):
-                    inner_json = inner_json.get(key)
-                inner_json.sort()
-                identified_license = ' AND '.join(inner_json)
-            except Exception:
-                logging.debug(f'Failed getting data from clearlydefined, with "{key}" out of {LICENSE_EXPRESSION_PATH}')
-                error_msg = f'Failed getting data from clearlydefined, with "{key}" out of {LICENSE_EXPRESSION_PATH}'
-                identified_license = None
+            identified_license, error_msg = self.__definition_license(json_data)
 
         ret = {
             'license': identified_license,
@@ -99,3 +106,119 @@ class ClearlyDefined(LicenseProvider):
             'error_message': error_msg,
         }
         return ret
+
+    def __definition_license(self, json_data):
+        # returns (license, error message) from a definition
+        try:
+            inner_json = json_data
+            for key in LICENSE_EXPRESSION_PATH.split('.'):
+                inner_json = inner_json.get(key)
+            inner_json.sort()
+            return ' AND '.join(inner_json), None
+        except Exception:
+            logging.debug(f'Failed getting data from clearlydefined, with "{key}" out of {LICENSE_EXPRESSION_PATH}')
+            return None, f'Failed getting data from clearlydefined, with "{key}" out of {LICENSE_EXPRESSION_PATH}'
+
+    def __stored_result(self, coord_url):
+        # a result stored by lookup_license_packages, not used when updating the cache
+        try:
+            cache = LookupLicenseCache()
+            if cache.update_mode:
+                return None
+            return cache.get_stored(f'{PROVIDER_CACHE_PREFIX}{coord_url}')
+        except Exception as e:
+            logging.debug(f'Could not read stored definition for {coord_url}: {e}')
+            return None
+
+    def __store_result(self, coord_url, result):
+        try:
+            LookupLicenseCache().store(f'{PROVIDER_CACHE_PREFIX}{coord_url}', result)
+        except Exception as e:
+            logging.debug(f'Could not store definition for {coord_url}: {e}')
+
+    def __package_coordinates(self, package):
+        # a purl or a (type, namespace, name, version) tuple
+        if isinstance(package, str):
+            return self.purl_to_coordinate(package)
+        return self.parameters_to_coordinates(*package)
+
+    def __download_definitions(self, coordinates):
+        # the definitions of many coordinates, in one request
+        url = f'{self.api_url}/definitions'
+        logging.info(f'download: {url} ({len(coordinates)} coordinates)')
+        response = http_session().post(url, json=coordinates, timeout=lookup_license.config.http_timeout)
+        if response.status_code != 200:
+            raise Exception(f'Could not download definitions from {url}, status code: {response.status_code}.')
+        definitions = response.json()
+        # the coordinates may be returned in another case
+        lowered = {key.lower(): value for key, value in definitions.items()}
+        return {coordinate: definitions.get(coordinate) or lowered.get(coordinate.lower()) for coordinate in coordinates}
+
+    def lookup_license_packages(self, packages, chunk_size=None):
+        # Looks up many packages (purls or (type, namespace, name,
+        # version) tuples) using a POST to /definitions for each
+        # chunk_size packages. Returns a list, in the order of
+        # packages, with the same data as lookup_license_package.
+        #
+        # The results of the packages with a definition are stored,
+        # and used by lookup_license_package for the same coordinates.
+        chunk_size = chunk_size or lookup_license.config.clearlydefined_chunk_size
+        packages = list(packages)
+        logging.debug(f'{self.__class__.__name__}:lookup_license_packages {len(packages)} packages, chunk size {chunk_size}')
+
+        coordinates = []
+        for package in packages:
+            try:
+                coordinates.append(self.__package_coordinates(package))
+            except Exception as e:
+                logging.debug(f'Could not convert {package} to a coordinate: {e}')
+                coordinates.append(None)
+
+        valid_coordinates = list(dict.fromkeys(coordinate for coordinate in coordinates if coordinate))
+        chunks = [valid_coordinates[i:i + chunk_size] for i in range(0, len(valid_coordinates), chunk_size)]
+        definitions = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max(min(lookup_license.config.http_workers, len(chunks)), 1)) as executor:
+            futures = [(chunk, executor.submit(self.__download_definitions, chunk)) for chunk in chunks]
+            for chunk, future in futures:
+                try:
+                    definitions.update(future.result())
+                except Exception as e:
+                    logging.debug(f'{self.__class__.__name__}:lookup_license_packages {e}')
+                    errors.update({coordinate: str(e) for coordinate in chunk})
+
+        results = []
+        for package, coordinate in zip(packages, coordinates):
+            error_msg = None
+            identified_license = None
+            if not coordinate:
+                error_msg = f'Could not convert {package} to a coordinate.'
+            elif coordinate in errors:
+                error_msg = errors[coordinate]
+            elif not definitions.get(coordinate):
+                error_msg = f'No definition of {coordinate} in clearlydefined.'
+            else:
+                identified_license, error_msg = self.__definition_license(definitions[coordinate])
+            result = {
+                'license': identified_license,
+                'data_url': f'{self.api_url}/definitions/{coordinate}' if coordinate else None,
+                'data_path': LICENSE_EXPRESSION_PATH,
+                'error_message': error_msg,
+            }
+            if definitions.get(coordinate):
+                self.__store_result(result['data_url'], result)
+            results.append(dict(result, **{
+                'provider': self.name(),
+                'url': package if isinstance(package, str) else coordinate,
+                'status': identified_license is not None,
+            }))
+        return results
+
+    def prefetch_packages(self, packages):
+        # Looks up the (type, namespace, name, version) packages not
+        # already stored in batches, returns the number looked up
+        packages = [package for package in dict.fromkeys(packages)
+                    if not self.__stored_result(self.parameters_to_url(*package))]
+        if packages:
+            self.lookup_license_packages(packages)
+        return len(packages)
@@ -0,0 +1,13 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from enum import Enum
+
+class Ecosystem(Enum):
+    PYPI = 'pypi'
+    GITREPO = 'git'
+    SWIFT = 'swift'
+    GEM = 'gem'
+    MAVEN = 'maven'
+    GO = 'go'
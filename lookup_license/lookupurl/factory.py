@@ -2,43 +2,40 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from lookup_license.lookupurl.gitrepo import GitRepo
-from lookup_license.lookupurl.gem import Gem
-from lookup_license.lookupurl.go import Go
-from lookup_license.lookupurl.purl import Purl
-from lookup_license.lookupurl.purl import Ecosystem
-from lookup_license.lookupurl.url import Url
-from lookup_license.lookupurl.pypi import Pypi
-from lookup_license.lookupurl.swift import Swift
-from lookup_license.lookupurl.maven import Maven
+from lookup_license.lookupurl.ecosystem import Ecosystem
 
 from lookup_license.utils import contains
 
+import importlib
 import logging
 
+# The handlers (and what they import) are imported when first used
+_lookup_map = {
+    'purl': ('purl', 'Purl'),
+    Ecosystem.PYPI.value: ('pypi', 'Pypi'),
+    Ecosystem.PYPI: ('pypi', 'Pypi'),
+    Ecosystem.GITREPO.value: ('gitrepo', 'GitRepo'),
+    Ecosystem.GITREPO: ('gitrepo', 'GitRepo'),
+    'url': ('url', 'Url'),
+    Ecosystem.SWIFT.value: ('swift', 'Swift'),
+    Ecosystem.SWIFT: ('swift', 'Swift'),
+    Ecosystem.GEM: ('gem', 'Gem'),
+    Ecosystem.GEM.value: ('gem', 'Gem'),
+    Ecosystem.MAVEN: ('maven', 'Maven'),
+    Ecosystem.MAVEN.value: ('maven', 'Maven'),
+    Ecosystem.GO: ('go', 'Go'),
+    Ecosystem.GO.value: ('go', 'Go'),
+}
+
 class LookupURLFactory:
 
     @staticmethod
     def lookupurl(url_type):
         logging.debug(f'LookupURLFactory:lookup "{url_type}"')
-        _lookup_map = {
-            'purl': Purl,
-            Ecosystem.PYPI.value: Pypi,
-            Ecosystem.PYPI: Pypi,
-            Ecosystem.GITREPO.value: GitRepo,
-            Ecosystem.GITREPO: GitRepo,
-            'url': Url,
-            Ecosystem.SWIFT.value: Swift,
-            Ecosystem.SWIFT: Swift,
-            Ecosystem.GEM: Gem,
-            Ecosystem.GEM.value: Gem,
-            Ecosystem.MAVEN: Maven,
-            Ecosystem.MAVEN.value: Maven,
-            Ecosystem.GO: Go,
-            Ecosystem.GO.value: Go,
-        }
         try:
-            lookup_class = _lookup_map[url_type]
+            module_name, class_name = _lookup_map[url_type]
+            module = importlib.import_module(f'lookup_license.lookupurl.{module_name}')
+            lookup_class = getattr(module, class_name)
             lookup_object = lookup_class()
             return lookup_object
         except Exception as e:
@@ -48,16 +45,19 @@ class LookupURLFactory:
     def lookupurl_url(url):
         if not url.startswith('pkg:'):
             raise Exception(f'Purl "{url}" not a valid purl.')
+        # only the type (e.g. "pkg:golang"), since the name may
+        # contain any of the types (e.g. pkg:golang/github.com/google/gemma)
+        purl_type = url.split('/')[0]
         url_type = None
-        if contains(url, ['gem', 'rubygems']):
+        if contains(purl_type, ['gem', 'rubygems']):
             url_type = Ecosystem.GEM
-        elif contains(url, ['pypi']):
+        elif contains(purl_type, ['pypi']):
             url_type = Ecosystem.PYPI
-        elif contains(url, ['swift']):
+        elif contains(purl_type, ['swift']):
             url_type = Ecosystem.SWIFT
-        elif contains(url, ['maven']):
+        elif contains(purl_type, ['maven']):
             url_type = Ecosystem.MAVEN
-        elif contains(url, ['go']):
+        elif contains(purl_type, ['go']):
             url_type = Ecosystem.GO
 
         if not url_type:
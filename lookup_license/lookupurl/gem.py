@@ -16,6 +16,8 @@ import logging
 
 class Gem(LookupURL):
 
+    cache_namespace = 'gem'
+
     def __init__(self):
         logging.debug("Gem()")
         self.gitrepo = GitRepo()
@@ -221,14 +223,16 @@ class Gem(LookupURL):
             'version': pkg_version,
         }
 
+    def provider_package(self, url, version=None):
+        parameters = self.get_parameters(url, version)
+        logging.debug(f'{self.__class__.__name__}:provider_package parameters: {parameters}')
+        return 'gem/rubygems', None, parameters['name'], parameters['version']
+
     def lookup_providers(self, url, version=None):
         logging.debug(f'{self.__class__.__name__}:lookup_providers {url}, {version}')
 
-        parameters = self.get_parameters(url, version)
-        logging.debug(f'{self.__class__.__name__}:lookup_providers parameters: {parameters}')
-
         # Identify licenses at providers
-        providers = LicenseProviders().lookup_license_package(url, 'gem/rubygems', None, parameters['name'], parameters['version'])
+        providers = LicenseProviders().lookup_license_package(url, *self.provider_package(url, version))
         logging.debug(f'{self.__class__.__name__}:lookup_providers_impl providers: {providers}')
 
         return providers
@@ -10,6 +10,9 @@ import logging
 
 class GitRepo(LookupURL):
 
+    url_impl_needs_package = False
+    cache_namespace = 'git'
+
     def __init__(self):
 
         self.MAIN_BRANCHES = ['main', 'master', 'develop']
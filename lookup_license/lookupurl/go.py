@@ -15,6 +15,8 @@ import logging
 
 class Go(LookupURL):
 
+    cache_namespace = 'go'
+
     def __init__(self):
         logging.debug("Go()")
         self.gitrepo = GitRepo()
@@ -106,6 +108,17 @@ class Go(LookupURL):
         }
         return ret
 
+    def purl_to_pkg_go_dev(self, url):
+        # pkg:golang/github.com/gorilla/mux@v1.8.0 => https://pkg.go.dev/github.com/gorilla/mux@v1.8.0
+        purl_object = PackageURL.from_string(url)
+        if purl_object.namespace:
+            module = f'{purl_object.namespace}/{purl_object.name}'
+        else:
+            module = purl_object.name
+        if purl_object.version:
+            return f'https://pkg.go.dev/{module}@{purl_object.version}'
+        return f'https://pkg.go.dev/{module}'
+
     def get_parameters(self, url, version):
         logging.debug(f'{self.__class__.__name__}:get_parameters {url}, {version}')
         if url.startswith('https://pkg.go.dev'):
@@ -121,12 +134,7 @@ class Go(LookupURL):
 
         if url.startswith('pkg:'):
             # purl
-            purl_object = PackageURL.from_string(url)
-            go_urls = []
-            if purl_object.version:
-                go_urls.append(f'https://pkg.go.dev/{purl_object.name}/{purl_object.version}/json')
-            else:
-                go_urls.append(f'https://pkg.go.dev//{purl_object.name}/json')
+            go_urls = [self.purl_to_pkg_go_dev(url)]
         elif url.startswith('http'):
             # https
             go_urls = [
@@ -240,14 +248,16 @@ class Go(LookupURL):
                 repo_data = None
         return repo_data
 
+    def provider_package(self, url, version=None):
+        parameters = self.get_parameters(url, version)
+        logging.debug(f'{self.__class__.__name__}:provider_package parameters: {parameters}')
+        return 'go', None, parameters['name'], parameters['version']
+
     def lookup_providers(self, url, version=None):
         logging.debug(f'{self.__class__.__name__}:lookup_providers {url}, {version}')
 
-        parameters = self.get_parameters(url, version)
-        logging.debug(f'{self.__class__.__name__}:lookup_providers parameters: {parameters}')
-
         # Identify licenses at providers
-        providers = LicenseProviders().lookup_license_package(url, 'go', None, parameters['name'], parameters['version'])
+        providers = LicenseProviders().lookup_license_package(url, *self.provider_package(url, version))
         logging.debug(f'{self.__class__.__name__}:lookup_providers_impl providers: {providers}')
 
         return providers
@@ -26,5 +26,11 @@ class LicenseProvider():
         data['status'] = data['license'] is not None
         return data
 
+    def prefetch_packages(self, packages):
+        # Looks up many (type, namespace, name, version) packages
+        # ahead of lookup_license_package, by providers able to do so
+        # in batches. Returns the number of packages looked up.
+        return 0
+
     def parameters_to_url(self, pkg_type, pkg_namespace, pkg_name, pkg_version, pkg_qualifiers=None, pkg_subpath=None):
         raise Exception('Subclasses to LicenseProvider must implment: parameters_to_url')
@@ -5,7 +5,12 @@
 from lookup_license.lookupurl.clearlydefined import ClearlyDefined
 from lookup_license.lookupurl.purldb import PurlDB
 
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 import logging
+import time
+
+import lookup_license.config
 
 class LicenseProviders:
 
@@ -26,6 +31,19 @@ class LicenseProviders:
     def providers(self):
         return [x.name() for x in self.provider_list]
 
+    def prefetch_packages(self, packages):
+        # Looks up many (type, namespace, name, version) packages,
+        # ahead of lookup_license_package, at the providers able to
+        # do so in batches
+        packages = [(pkg_type, pkg_namespace or self.name_namespace_map[pkg_type], pkg_name, pkg_version)
+                    for pkg_type, pkg_namespace, pkg_name, pkg_version in packages]
+        for provider in self.provider_list:
+            try:
+                count = provider.prefetch_packages(packages)
+                logging.debug(f'{self.__class__.__name__}:prefetch_packages {count} packages looked up at {provider.name()}')
+            except Exception as e:
+                logging.debug(f'{self.__class__.__name__}:prefetch_packages {provider.name()} failed: {e}')
+
     def lookup_license_package(self, orig_url, pkg_type, pkg_namespace, pkg_name, pkg_version, pkg_qualifiers=None, pkg_subpath=None):
         logging.debug(f'{self.__class__.__name__}:lookup_license_package {orig_url}, {pkg_type}, {pkg_namespace}, {pkg_name}, {pkg_version}, {pkg_qualifiers}, {pkg_subpath}')
         providers = {}
@@ -33,9 +51,54 @@ class LicenseProviders:
         if not pkg_namespace or pkg_namespace == '':
             pkg_namespace = self.name_namespace_map[pkg_type]
 
-        for provider in self.provider_list:
-            name = provider.name()
-            provider_data = provider.lookup_license_package(orig_url, pkg_type, pkg_namespace, pkg_name, pkg_version, pkg_qualifiers, pkg_subpath)
-            providers[name] = provider_data
+        # The providers are queried concurrently. A provider not
+        # answering within the timeout is reported as such, with the
+        # answers from the other providers kept.
+        timeout = lookup_license.config.provider_timeout
+        executor = ThreadPoolExecutor(max_workers=len(self.provider_list))
+        try:
+            futures = {provider.name(): executor.submit(self.__lookup_provider, provider, orig_url, pkg_type, pkg_namespace, pkg_name, pkg_version, pkg_qualifiers, pkg_subpath) for provider in self.provider_list}
+            wait(futures.values(), timeout=timeout)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for name, future in futures.items():
+            if future.done():
+                providers[name] = future.result()
+            else:
+                logging.debug(f'{self.__class__.__name__}:lookup_license_package {name} did not answer within {timeout} seconds')
+                providers[name] = {
+                    'license': None,
+                    'data_url': None,
+                    'error_message': f'No answer from {name} within {timeout} seconds.',
+                    'provider': name,
+                    'url': orig_url,
+                    'status': False,
+                    'answered': False,
+                    'error': f'timeout after {timeout} seconds',
+                    'elapsed': timeout,
+                }
 
         return providers
+
+    def __lookup_provider(self, provider, orig_url, pkg_type, pkg_namespace, pkg_name, pkg_version, pkg_qualifiers, pkg_subpath):
+        # A provider failing is reported as such, not answering, with
+        # the answers from the other providers kept.
+        start = time.monotonic()
+        try:
+            provider_data = provider.lookup_license_package(orig_url, pkg_type, pkg_namespace, pkg_name, pkg_version, pkg_qualifiers, pkg_subpath)
+            provider_data['answered'] = True
+        except Exception as e:
+            logging.debug(f'{self.__class__.__name__}:lookup_license_package {provider.name()} failed: {e}')
+            provider_data = {
+                'license': None,
+                'data_url': None,
+                'error_message': f'Failed looking up {orig_url} at {provider.name()}: {e}',
+                'provider': provider.name(),
+                'url': orig_url,
+                'status': False,
+                'answered': False,
+                'error': f'{e.__class__.__name__}: {e}',
+            }
+        provider_data['elapsed'] = round(time.monotonic() - start, 3)
+        return provider_data
@@ -5,14 +5,42 @@
 from lookup_license.lookuplicense import LookupLicense
 from lookup_license.retrieve import Retriever
 from lookup_license.cache import LookupLicenseCache
+from lookup_license.cache import url_cache_key
 from lookup_license.license_db import LicenseDatabase
 
 from license_expression import ExpressionError
 
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+import asyncio
 import logging
+import threading
+
+import lookup_license.config
+
+_lookup_executor = None
+_lookup_executor_lock = threading.Lock()
+
+def lookup_executor():
+    # bounded pool of threads running the lookups of lookup_url_async
+    global _lookup_executor
+    with _lookup_executor_lock:
+        if not _lookup_executor:
+            _lookup_executor = ThreadPoolExecutor(max_workers=lookup_license.config.lookup_async_workers,
+                                                  thread_name_prefix='lookup-license-url')
+    return _lookup_executor
 
 class LookupURL:
 
+    # Set to False in sub classes not using the package data (or the
+    # providers data) in lookup_url_impl, which then is started
+    # without waiting for lookup_package.
+    url_impl_needs_package = True
+
+    # The namespace of the cached results (see url_cache_key), set in
+    # sub classes to the ecosystem they lookup
+    cache_namespace = 'url'
+
     def __init__(self):
         logging.debug("LookupURL()")
         self.lookup_license = LookupLicense()
@@ -25,56 +53,108 @@ class LookupURL:
         logging.debug(f'{self.__class__.__name__}:lookup_providers {url}, {version}')
         return None
 
+    def provider_package(self, url, version):
+        # The (type, namespace, name, version) looked up at the
+        # providers by lookup_providers, or None
+        return None
+
     def name(self):
         logging.debug(f'{self.__class__.__name__}:lookup_name()')
         return 'LookupURL'
 
-    def get_parameters(self, url):
-        logging.debug(f'{self.__class__.__name__}:lookup_name()')
+    def get_parameters(self, url, version=None):
+        logging.debug(f'{self.__class__.__name__}:get_parameters()')
         return None
 
-    def lookup_url(self, url):
-        logging.debug(f'{self.__class__.__name__}:lookup_url {url}')
-
+    def version_hint(self, url):
+        # The version, if given in the url (e.g. pkg:pypi/boto3@1.0),
+        # which makes it possible to query the providers without
+        # waiting for the package data
         try:
-            return LookupLicenseCache().get(url)
+            parameters = self.get_parameters(url, None)
         except Exception as e:
-            logging.debug(f'lookup_url: failed to get data from cache for {url}, {e}')
+            logging.debug(f'{self.__class__.__name__}:version_hint no version in {url}: {e}')
+            return None
+        if not parameters:
+            return None
+        return parameters.get('version')
 
-        # Lookup package data (e.g. from pypi.org), if any
-        # .. this is typically implemented by sub classes
-
-        package_data = self.lookup_package(url)
-        if package_data:
-            try:
-                package_details = package_data.get('package_details')
-                version = package_details.get('version')
-                if 'package_license_texts' in package_details:
-                    package_license_texts = package_details['package_license_texts']
-                else:
-                    logging.debug(f'Failed getting package_license_texts from data as received from {url}.')
-
-                license_list = []
-                if package_license_texts:
-                    for license_text in package_license_texts:
-                        lookedup_licenses = self.lookup_license.lookup_license_text(license_text)
-                        license_list += [x['license'] for x in lookedup_licenses['normalized']]
-                del package_details['package_license_texts']
-                package_details['package_license_text'] = ', '.join(license_list)
-            except Exception as e:
-                logging.debug(f'Failed getting version from data as received from {url}. Exception: {e}')
-                version = None
+    def __package_version(self, url, package_data):
+        if not package_data:
+            return None
 
-        else:
+        try:
+            package_details = package_data.get('package_details')
+            version = package_details.get('version')
+            if 'package_license_texts' in package_details:
+                package_license_texts = package_details['package_license_texts']
+            else:
+                logging.debug(f'Failed getting package_license_texts from data as received from {url}.')
+
+            license_list = []
+            if package_license_texts:
+                for license_text in package_license_texts:
+                    lookedup_licenses = self.lookup_license.lookup_license_text(license_text)
+                    license_list += [x['license'] for x in lookedup_licenses['normalized']]
+            del package_details['package_license_texts']
+            package_details['package_license_text'] = ', '.join(license_list)
+        except Exception as e:
+            logging.debug(f'Failed getting version from data as received from {url}. Exception: {e}')
             version = None
 
-        # Identify licenses at providers
-        # .. this is typically implemented by sub classes
-        providers_data = self.lookup_providers(url, version)
+        return version
+
+    def lookup_url(self, url):
+        logging.debug(f'{self.__class__.__name__}:lookup_url {url}')
+
+        cache_key = url_cache_key(self.cache_namespace, url)
+        try:
+            data = LookupLicenseCache().get(cache_key)
+            # possibly stored when looking up the url written differently
+            data['provided'] = url
+            return data
+        except Exception as e:
+            logging.debug(f'lookup_url: failed to get data from cache for {url}, {e}')
 
-        # Identify licenses from urls (e.g. from package_data)
-        # .. this is typically implemented by sub classes
-        url_data = self.lookup_url_impl(url, package_data, providers_data)
+        # The package data, the providers and the repository urls are
+        # looked up concurrently, as soon as what they depend on is
+        # known:
+        # * the providers need the version, either from the url
+        #   (e.g. a purl with version) or from the package data
+        # * the repository urls are typically suggested by the package data
+        executor = ThreadPoolExecutor(max_workers=3)
+        try:
+            # Lookup package data (e.g. from pypi.org), if any
+            # .. this is typically implemented by sub classes
+            package_future = executor.submit(self.lookup_package, url)
+
+            version_hint = self.version_hint(url)
+            providers_future = None
+            if version_hint:
+                providers_future = executor.submit(self.lookup_providers, url, version_hint)
+
+            url_future = None
+            if not self.url_impl_needs_package:
+                url_future = executor.submit(self.lookup_url_impl, url, None, None)
+
+            package_data = package_future.result()
+            version = self.__package_version(url, package_data)
+
+            # Identify licenses at providers
+            # .. this is typically implemented by sub classes
+            if providers_future:
+                providers_data = providers_future.result()
+            else:
+                providers_data = self.lookup_providers(url, version)
+
+            # Identify licenses from urls (e.g. from package_data)
+            # .. this is typically implemented by sub classes
+            if url_future:
+                url_data = url_future.result()
+            else:
+                url_data = self.lookup_url_impl(url, package_data, providers_data)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
         licenses_object = self.licenses(package_data, url_data, providers_data)
 
@@ -92,14 +172,70 @@ class LookupURL:
             'identified_license_string': licenses_object['identified_license_string'],
         }
 
-        logging.debug(f'add to cache: {url}')
-        LookupLicenseCache().add(url, data)
+        logging.debug(f'add to cache: {url} ({cache_key})')
+        LookupLicenseCache().add(cache_key, data)
 
         return data
 
+    async def lookup_url_async(self, url):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(lookup_executor(), self.lookup_url, url)
+
+    async def lookup_urls_async(self, urls):
+        # results in the order of urls, a failed lookup giving the
+        # raised exception instead of a result
+        return await asyncio.gather(*[self.lookup_url_async(url) for url in urls], return_exceptions=True)
+
     def lookup_url_impl(self, url):
         return self.lookup_license_urls(url, [[url]])
 
+    def __download_urls(self, executor, retriever, suggestion_list):
+        return [executor.submit(retriever.download_url, url_object['license_raw_url']) for url_object in suggestion_list]
+
+    def __identify_url(self, url_object, retrieved_result):
+        # returns (failed url, successful url, licenses)
+        _url = url_object['license_raw_url']
+        _orig_url = url_object['original_url']
+
+        success = retrieved_result['success']
+        if not success:
+            return {
+                'url': _url,
+                'original_url': _orig_url,
+                'failed': 'download',
+                'failure_details': retrieved_result,
+            }, None, []
+
+        # identify license
+        decoded_content = retrieved_result['decoded_content']
+        lic = self.lookup_license.lookup_license_text(decoded_content)
+        status = lic["status"]
+        if not status:
+            return {
+                'url': _url,
+                'original_url': _orig_url,
+                'downloaded': retrieved_result,
+                'failed': 'lookup-license',
+                'failure_details': lic,
+            }, None, []
+
+        licenses_from_url = []
+        if status:
+            for _lic in lic['normalized']:
+                logging.debug(f'{self.__class__.__name__}:identify_url license: {_lic}')
+                licenses_from_url.append(_lic["license"])
+            licenses_from_url_str = ' AND '.join(licenses_from_url)
+            if licenses_from_url:
+                return None, {
+                    'url': _url,
+                    'original_url': _orig_url,
+                    'license': licenses_from_url_str,
+                    'lookup-type': 'license-file',
+                    'downloaded': retrieved_result,
+                    'details': _lic,
+                }, licenses_from_url
+        return None, None, []
+
     def lookup_license_urls(self, url, suggestions):
         logging.debug(f'{self.__class__.__name__}:lookup_license_urls {url}, {suggestions is not None}')
         retriever = Retriever()
@@ -108,58 +244,39 @@ class LookupURL:
         successful_urls = []
         license_identifications = []
 
-        for suggestion_list in suggestions:
-            for url_object in suggestion_list:
-                _url = url_object['license_raw_url']
-                _orig_url = url_object['original_url']
-
-                # download
-                retrieved_result = retriever.download_url(_url)
-                success = retrieved_result['success']
-
-                if not success:
-                    failed_urls.append({
-                        'url': _url,
-                        'original_url': _orig_url,
-                        'failed': 'download',
-                        'failure_details': retrieved_result,
-                    })
-                    continue
-
-                # identify license
-                decoded_content = retrieved_result['decoded_content']
-                lic = self.lookup_license.lookup_license_text(decoded_content)
-                status = lic["status"]
-                if not status:
-                    failed_urls.append({
-                        'url': _url,
-                        'original_url': _orig_url,
-                        'downloaded': retrieved_result,
-                        'failed': 'lookup-license',
-                        'failure_details': lic,
-                    })
-                    continue
-
-                licenses_from_url = []
-                if status:
-                    for _lic in lic['normalized']:
-                        print("_lic: " + str(_lic))
-                        print("_lic: " + str(status))
-                        licenses_from_url.append(_lic["license"])
-                    licenses_from_url_str = ' AND '.join(licenses_from_url)
-                    if licenses_from_url:
-                        successful_urls.append({
-                            'url': _url,
-                            'original_url': _orig_url,
-                            'license': licenses_from_url_str,
-                            'lookup-type': 'license-file',
-                            'downloaded': retrieved_result,
-                            'details': _lic,
-                        })
+        # The urls in a suggestion list are downloaded concurrently,
+        # and identified as they are downloaded. The next suggestion
+        # list is downloaded in the background and cancelled if a
+        # license is identified.
+        executor = ThreadPoolExecutor(max_workers=lookup_license.config.http_workers)
+        try:
+            if suggestions:
+                next_downloads = self.__download_urls(executor, retriever, suggestions[0])
+            for index, suggestion_list in enumerate(suggestions):
+                downloads = next_downloads
+                if index + 1 < len(suggestions):
+                    next_downloads = self.__download_urls(executor, retriever, suggestions[index + 1])
+
+                download_index = {download: i for i, download in enumerate(downloads)}
+                identified = {}
+                for download in as_completed(downloads):
+                    i = download_index[download]
+                    identified[i] = self.__identify_url(suggestion_list[i], download.result())
+
+                # keep the order of the suggestions
+                for i in sorted(identified):
+                    failed_url, successful_url, licenses_from_url = identified[i]
+                    if failed_url:
+                        failed_urls.append(failed_url)
+                    if successful_url:
+                        successful_urls.append(successful_url)
                         license_identifications.extend(licenses_from_url)
 
-            if license_identifications:
-                break
+                if license_identifications:
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
         logging.debug(f'lookup_license_url ({license} ==> {" AND ".join(license_identifications)}')
 
         if license_identifications:
@@ -211,7 +328,7 @@ class LookupURL:
         try:
             identified_license = [LicenseDatabase.expression_license_identified(x) for x in all_licenses]
         except ExpressionError:
-            identified_license = all_licenses
+            identified_license = list(all_licenses)
 
         try:
             identified_license_string = LicenseDatabase.summarize_license(all_licenses)
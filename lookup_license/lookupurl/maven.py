@@ -17,6 +17,8 @@ import logging
 
 class Maven(LookupURL):
 
+    cache_namespace = 'maven'
+
     def __init__(self):
         logging.debug("Pypi()")
         self.gitrepo = GitRepo()
@@ -150,7 +152,7 @@ class Maven(LookupURL):
             'package_details': package_details,
         }
 
-    def lookup_providers(self, url, version=None):
+    def provider_package(self, url, version=None):
         if 'pkg' in url or 'https' in url:
             if 'pkg' in url:
                 purl = url
@@ -158,19 +160,15 @@ class Maven(LookupURL):
                 purl = self._http_to_pkg(url)
 
             purl_object = PackageURL.from_string(purl)
-            ns = purl_object.namespace
-            n = purl_object.name
-            v = purl_object.version
+            return 'maven', purl_object.namespace, purl_object.name, purl_object.version
 
-            # Identify licenses at providers
-            providers = LicenseProviders().lookup_license_package(url, 'maven', ns, n, v)
-            logging.debug(f'{self.__class__.__name__}:lookup_providers_impl providers: {providers}')
-            return providers
+        raise Exception(f'URL like {url} not yet supported for maven')
 
-        else:
-            raise Exception(f'URL like {url} not yet supported for maven')
-
-        return None
+    def lookup_providers(self, url, version=None):
+        # Identify licenses at providers
+        providers = LicenseProviders().lookup_license_package(url, *self.provider_package(url, version))
+        logging.debug(f'{self.__class__.__name__}:lookup_providers_impl providers: {providers}')
+        return providers
 
     def name(self):
         logging.debug(f'{self.__class__.__name__}:name()')
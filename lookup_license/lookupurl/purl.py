@@ -14,20 +14,15 @@ from lookup_license.lookupurl.swift import Swift
 from lookup_license.lookupurl.gitrepo import GitRepo
 from lookup_license.lookupurl.maven import Maven
 
-from enum import Enum
-import logging
+from lookup_license.lookupurl.ecosystem import Ecosystem # noqa: F401
 
-class Ecosystem(Enum):
-    PYPI = 'pypi'
-    GITREPO = 'git'
-    SWIFT = 'swift'
-    GEM = 'gem'
-    MAVEN = 'maven'
-    GO = 'go'
+import logging
 
 
 class Purl(LookupURL):
 
+    cache_namespace = 'purl'
+
     def __init__(self):
         logging.debug("Purl()")
         self.gitrepo = GitRepo()
@@ -16,7 +16,7 @@ import sys
 
 from packageurl import PackageURL  # noqa: I900
 
-import requests
+from lookup_license.retrieve import http_session
 
 def is_sha1(sha: str) -> bool:
     """Check if a string is a valid SHA1 hash.
@@ -79,7 +79,7 @@ def get_tag_commit_sha(owner: str, repo: str, tag: str) -> str:
         headers["Authorization"] = f"Bearer {token}"
 
     url = f"https://api.github.com/repos/{owner}/{repo}/git/ref/tags/{tag}"
-    response = requests.get(url, headers=headers, timeout=30)
+    response = http_session().get(url, headers=headers, timeout=30)
     response.raise_for_status()
 
     data = response.json()
@@ -88,7 +88,7 @@ def get_tag_commit_sha(owner: str, repo: str, tag: str) -> str:
         # Get the commit URL from the annotated tag
         tag_url = data["object"]["url"]
         validate_tag_url(tag_url)
-        tag_response = requests.get(tag_url, headers=headers, timeout=10)
+        tag_response = http_session().get(tag_url, headers=headers, timeout=10)
         tag_response.raise_for_status()
         return tag_response.json()["object"]["sha"]
 
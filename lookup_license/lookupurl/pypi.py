@@ -17,6 +17,8 @@ import re
 
 class Pypi(LookupURL):
 
+    cache_namespace = 'pypi'
+
     def __init__(self):
         logging.debug("Pypi()")
         self.gitrepo = GitRepo()
@@ -217,14 +219,16 @@ class Pypi(LookupURL):
 
         return identified_pypi_data
 
+    def provider_package(self, url, version=None):
+        parameters = self.get_parameters(url, version)
+        logging.debug(f'{self.__class__.__name__}:provider_package parameters: {parameters}')
+        return 'pypi/pypi', None, parameters['name'], parameters['version']
+
     def lookup_providers(self, url, version=None):
         logging.debug(f'{self.__class__.__name__}:lookup_providers {url}, {version}')
 
-        parameters = self.get_parameters(url, version)
-        logging.debug(f'{self.__class__.__name__}:lookup_providers parameters: {parameters}')
-
         # Identify licenses at providers
-        providers = LicenseProviders().lookup_license_package(url, 'pypi/pypi', None, parameters['name'], parameters['version'])
+        providers = LicenseProviders().lookup_license_package(url, *self.provider_package(url, version))
         logging.debug(f'{self.__class__.__name__}:lookup_providers_impl providers: {providers}')
 
         return providers
@@ -16,6 +16,8 @@ import re
 
 class Swift(LookupURL):
 
+    cache_namespace = 'swift'
+
     swiftpackageindex = None
     swiftpackageindex_cache_key = 'lookup-license-swift-cache'
 
@@ -173,14 +175,16 @@ class Swift(LookupURL):
             'repo_suggestions': url_suggestions,
         }
 
+    def provider_package(self, url, version=None):
+        parameters = self.get_parameters(url, version)
+        logging.debug(f'{self.__class__.__name__}:provider_package parameters: {parameters}')
+        return 'gem', None, parameters['name'], parameters['version']
+
     def lookup_providers(self, url, version=None):
         logging.debug(f'{self.__class__.__name__}:lookup_providers {url}, {version}')
 
-        parameters = self.get_parameters(url, version)
-        logging.debug(f'{self.__class__.__name__}:lookup_providers parameters: {parameters}')
-
         # Identify licenses at providers
-        providers = LicenseProviders().lookup_license_package(url, 'gem', None, parameters['name'], parameters['version'])
+        providers = LicenseProviders().lookup_license_package(url, *self.provider_package(url, version))
         logging.debug(f'{self.__class__.__name__}:lookup_providers_impl providers: {providers}')
 
         return providers
@@ -193,7 +197,7 @@ class Swift(LookupURL):
             pkg_name = purl_dict['name']
             pkg_version = purl_dict['version']
             pkg_namespace = purl_dict['namespace']
-            print("PJK... " + str(purl_dict))
+            logging.debug(f'{self.__class__.__name__}:get_parameters {purl_dict}')
         else:
             # Create parameters from swift package name
             stripped_url = re.sub(r'^[/]*swift/', '', url)
@@ -9,6 +9,8 @@ import logging
 
 class Url(LookupURL):
 
+    url_impl_needs_package = False
+
     def __init__(self):
         logging.debug("Url()")
         self.gitrepo = GitRepo()
@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+#
+# A pool of worker processes identifying license texts.
+#
+# Loading the scancode license index takes seconds and hundreds of
+# MB of memory. When the platform supports fork, the index is loaded
+# once, in the parent process, before the workers are started. The
+# workers then share the index (copy-on-write) instead of loading it
+# one time each.
+#
+
+import gc
+import logging
+import multiprocessing
+
+import lookup_license.config
+from lookup_license.lookuplicense import LookupLicense
+
+_lookup_license = None
+
+def _init_worker():
+    global _lookup_license
+    _lookup_license = LookupLicense()
+    # no-op if the index was inherited from the parent process
+    _lookup_license.warm()
+
+def _lookup_license_text(args):
+    index, license_text, minimum_score = args
+    return index, _lookup_license.lookup_license_text(license_text, minimum_score)
+
+class LookupLicensePool():
+
+    def __init__(self, processes=None, warm=True):
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing.get_context()
+
+        freeze = warm and context.get_start_method() == 'fork'
+        if freeze:
+            logging.debug('LookupLicensePool: loading license index before forking workers')
+            LookupLicense().warm()
+            # keep the garbage collector from touching (and thereby
+            # copying) the pages holding the index in the workers
+            gc.freeze()
+
+        logging.debug(f'LookupLicensePool: starting {processes} workers ({context.get_start_method()})')
+        try:
+            self.pool = context.Pool(processes, initializer=_init_worker)
+        finally:
+            if freeze:
+                # the workers are forked (frozen), the objects in this
+                # process are collected as usual again
+                gc.unfreeze()
+
+    def lookup_license_text(self, license_text, minimum_score=lookup_license.config.default_minimum_score):
+        index, result = self.pool.apply(_lookup_license_text, ((0, license_text, minimum_score),))
+        return result
+
+    def lookup_license_texts(self, license_texts, minimum_score=lookup_license.config.default_minimum_score, ordered=True):
+        # yields (index, result) tuples, index being the position of
+        # the license text in license_texts
+        args = [(index, license_text, minimum_score) for index, license_text in enumerate(license_texts)]
+        if ordered:
+            return self.pool.imap(_lookup_license_text, args)
+        return self.pool.imap_unordered(_lookup_license_text, args)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
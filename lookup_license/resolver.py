@@ -0,0 +1,123 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+#
+# Resolve (lookup the licenses of) many purls or package urls in one
+# process, sharing the license index, the cache and the http
+# connections between the lookups.
+#
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+import itertools
+import logging
+
+from lookup_license.cache import LookupLicenseCache
+from lookup_license.lookupurl.factory import LookupURLFactory
+
+import lookup_license.config
+
+def read_urls(fp):
+    # one purl or url per line, ignoring empty lines and comments
+    for line in fp:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        yield line
+
+def unique(urls):
+    seen = set()
+    for url in urls:
+        if url in seen:
+            continue
+        seen.add(url)
+        yield url
+
+class LookupURLResolver():
+
+    def __init__(self, workers=None, url_type=None):
+        # url_type is the ecosystem (e.g. 'pypi') used for urls that
+        # are not purls, e.g. package names
+        self.workers = workers or lookup_license.config.resolver_workers
+        self.url_type = url_type
+        self.handlers = {}
+
+    def handler(self, url):
+        if url.startswith('pkg:'):
+            lookupurl = LookupURLFactory.lookupurl_url(url)
+        elif self.url_type:
+            lookupurl = LookupURLFactory.lookupurl(self.url_type)
+        else:
+            raise Exception(f'"{url}" is not a purl and no package type was provided.')
+
+        # one handler per ecosystem
+        return self.handlers.setdefault(lookupurl.__class__, lookupurl)
+
+    def lookup_url(self, url):
+        return self.handler(url).lookup_url(url)
+
+    def prefetch(self, urls):
+        # Looks up the providers of the urls with a version (e.g. a
+        # pinned purl) in batches, before the urls are looked up one
+        # at a time. The urls without a version are looked up at the
+        # providers after reading the package data.
+        packages = []
+        for url in urls:
+            try:
+                handler = self.handler(url)
+                package = handler.provider_package(url, handler.version_hint(url))
+            except Exception as e:
+                logging.debug(f'{self.__class__.__name__}:prefetch {url} not prefetched: {e}')
+                continue
+            if package and package[3]:
+                packages.append(package)
+        if packages:
+            from lookup_license.lookupurl.license_providers import LicenseProviders
+            LicenseProviders().prefetch_packages(packages)
+
+    def __prefetched(self, urls):
+        # reads (and prefetches) the urls one batch at a time
+        chunk_size = lookup_license.config.clearlydefined_chunk_size
+        while True:
+            chunk = list(itertools.islice(urls, chunk_size))
+            if not chunk:
+                return
+            self.prefetch(chunk)
+            yield from chunk
+
+    def resolve(self, urls):
+        # Yields (url, result, error) tuples, in the order the lookups
+        # finish. Each url is looked up once.
+        #
+        # The urls are read as the lookups finish, with at most
+        # self.workers lookups at a time, so results are yielded
+        # before all urls are read (e.g. from a pipe). With
+        # config.resolver_prefetch, the urls are read (and their
+        # providers looked up) a batch at a time.
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        urls = unique(urls)
+        cache = LookupLicenseCache()
+        if lookup_license.config.resolver_prefetch and cache.enabled and not cache.update_mode:
+            # the prefetched results are passed on in the cache
+            urls = self.__prefetched(urls)
+        futures = {}
+        try:
+            while True:
+                for url in urls:
+                    futures[executor.submit(self.lookup_url, url)] = url
+                    if len(futures) >= self.workers:
+                        break
+                if not futures:
+                    break
+                done, pending = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = futures.pop(future)
+                    try:
+                        yield url, future.result(), None
+                    except Exception as e:
+                        logging.debug(f'{self.__class__.__name__}:resolve {url} failed: {e}')
+                        yield url, None, e
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -2,11 +2,68 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from lookup_license.config import http_timeout
+import lookup_license.config
+from lookup_license.cache import HTTP_CACHE_PREFIX
+from lookup_license.cache import MISS_CACHE_PREFIX
+from lookup_license.cache import LookupLicenseCache
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import logging
 import magic
 import requests
+import threading
+
+_session = None
+_session_lock = threading.Lock()
+_executor = None
+
+def _http_adapter(pool_size, hosts=1):
+    retry = Retry(total=lookup_license.config.http_retries,
+                  backoff_factor=lookup_license.config.http_backoff_factor,
+                  status_forcelist=[429, 500, 502, 503, 504],
+                  raise_on_status=False)
+    return HTTPAdapter(pool_connections=hosts, pool_maxsize=pool_size, max_retries=retry)
+
+def http_session():
+    # one session, shared by all threads, keeping connections alive
+    global _session
+    with _session_lock:
+        if not _session:
+            session = requests.Session()
+            for scheme in ['http://', 'https://']:
+                session.mount(scheme, _http_adapter(lookup_license.config.http_pool_size, hosts=10))
+            for host, pool_size in lookup_license.config.http_pool_sizes.items():
+                session.mount(f'https://{host}/', _http_adapter(pool_size))
+            _session = session
+    return _session
+
+def http_executor():
+    # bounded pool of threads running the downloads of AsyncRetriever
+    global _executor
+    with _session_lock:
+        if not _executor:
+            _executor = ThreadPoolExecutor(max_workers=lookup_license.config.http_async_workers,
+                                           thread_name_prefix='lookup-license-http')
+    return _executor
+
+def http_stats():
+    # requests and new connections per host, the difference being
+    # the requests using an already opened (kept-alive) connection
+    stats = {}
+    for adapter in set(http_session().adapters.values()):
+        for key in list(adapter.poolmanager.pools.keys()):
+            pool = adapter.poolmanager.pools.get(key)
+            if not pool:
+                continue
+            host_stats = stats.setdefault(pool.host, {'requests': 0, 'connections': 0, 'reused': 0})
+            host_stats['requests'] += pool.num_requests
+            host_stats['connections'] += pool.num_connections
+            host_stats['reused'] += pool.num_requests - pool.num_connections
+    return stats
 
 class Retriever():
 
@@ -38,12 +95,96 @@ class Retriever():
             'details': guesses,
         }
 
+    def _stored_response(self, url):
+        try:
+            return LookupLicenseCache().get_stored(f'{HTTP_CACHE_PREFIX}{url}')
+        except Exception as e:
+            logging.debug(f'Could not read stored response for {url}: {e}')
+            return None
+
+    def _store_response(self, url, response, decoded_content):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        try:
+            LookupLicenseCache().store(f'{HTTP_CACHE_PREFIX}{url}', {
+                'etag': etag,
+                'last_modified': last_modified,
+                'decoded_content': decoded_content,
+            })
+        except Exception as e:
+            logging.debug(f'Could not store response for {url}: {e}')
+
+    def _failed_download(self, url):
+        # a recent failed download of the url, not used when updating the cache
+        try:
+            cache = LookupLicenseCache()
+            if cache.update_mode:
+                return None
+            return cache.get_stored(f'{MISS_CACHE_PREFIX}{url}')
+        except Exception as e:
+            logging.debug(f'Could not read failed download for {url}: {e}')
+            return None
+
+    def _store_failed_download(self, url, code, error=None):
+        # connection errors are more likely to be temporary than a 404
+        expire = lookup_license.config.cache_ttls['error'] if error else None
+        try:
+            LookupLicenseCache().store(f'{MISS_CACHE_PREFIX}{url}', {
+                'code': code,
+                'error': error,
+            }, expire)
+        except Exception as e:
+            logging.debug(f'Could not store failed download for {url}: {e}')
+
     def download_url(self, url):
+        # Responses with validators (ETag, Last-Modified) are stored,
+        # so that a later download of the same url can be a
+        # conditional request reusing the stored content if the
+        # server responds 304 Not Modified.
+        #
+        # Failed downloads (e.g. 404 and connection errors) are
+        # stored for a short while (see config.cache_ttls), so that
+        # urls known not to exist are not downloaded again.
         logging.info(f'download: {url}')
-        response = requests.get(url, stream=True, timeout=http_timeout)
-        content = response.content
+        failed = self._failed_download(url)
+        if failed:
+            logging.debug(f'download: {url} failed recently ({failed["code"]}, {failed["error"]})')
+            if failed['error']:
+                raise requests.exceptions.ConnectionError(f'{failed["error"]} (failed recently, not retried)')
+            return {
+                'decoded_content': '',
+                'provided': url,
+                'code': failed['code'],
+                'success': False,
+                'url': url,
+            }
+
+        stored = self._stored_response(url)
+        headers = {}
+        if stored:
+            if stored['etag']:
+                headers['If-None-Match'] = stored['etag']
+            if stored['last_modified']:
+                headers['If-Modified-Since'] = stored['last_modified']
+
+        try:
+            response = http_session().get(url, stream=True, headers=headers, timeout=lookup_license.config.http_timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            self._store_failed_download(url, None, str(e))
+            raise
         code = response.status_code
-        decoded_content = content.decode('utf-8')
+        if code in lookup_license.config.negative_cache_codes:
+            self._store_failed_download(url, code)
+        if stored and code == 304:
+            logging.debug(f'download: {url} not modified, using stored content')
+            response.close()
+            code = 200
+            decoded_content = stored['decoded_content']
+        else:
+            decoded_content = response.content.decode('utf-8')
+            self._store_response(url, response, decoded_content)
         success = (not f'{code}'.startswith('40'))
         res = {
             'decoded_content': decoded_content,
@@ -57,4 +198,29 @@ class Retriever():
 
     def download_url_raw(self, url):
         logging.info(f'download: {url}')
-        return requests.get(url, stream=True, timeout=5)
+        return http_session().get(url, stream=True, timeout=lookup_license.config.http_timeout)
+
+    def stats(self):
+        return http_stats()
+
+
+class AsyncRetriever():
+    #
+    # asyncio interface to Retriever
+    #
+    # The downloads are made by Retriever (using the shared, pooled,
+    # session) in a bounded pool of threads. Any number of downloads
+    # can be outstanding, the number of threads stays the same.
+    #
+
+    def __init__(self, retriever=None):
+        self.retriever = retriever or Retriever()
+
+    async def download_url(self, url):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(http_executor(), self.retriever.download_url, url)
+
+    async def download_many(self, urls):
+        # results in the order of urls, a failed download giving the
+        # raised exception instead of a result
+        return await asyncio.gather(*[self.download_url(url) for url in urls], return_exceptions=True)
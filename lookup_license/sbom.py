@@ -0,0 +1,223 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+#
+# Lookup licenses for the components (packages) in an SBOM and write
+# the SBOM with the identified licenses added. Supported formats:
+#
+# * CycloneDX JSON
+# * SPDX JSON
+# * SPDX tag-value
+#
+# JSON documents are parsed from, and written to, the files directly
+# without keeping an extra copy of the document as a string. SPDX
+# tag-value documents are read line by line, twice: once to find the
+# purls and once to write the SBOM, keeping one package at a time in
+# memory.
+#
+
+import json
+import logging
+
+from lookup_license.license_db import LicenseDatabase
+from lookup_license.resolver import LookupURLResolver
+
+NO_LICENSE = [None, '', 'NOASSERTION', 'NONE']
+
+# tags starting a new element in SPDX tag-value documents
+SPDX_TAG_VALUE_ELEMENTS = ['PackageName:', 'FileName:', 'SnippetSPDXID:', 'LicenseID:']
+SPDX_TAG_VALUE_PACKAGE_TAGS = ('Package', 'SPDXID:', 'ExternalRef:', 'FilesAnalyzed:')
+
+def license_comment(lic):
+    # a license found, but not written as concluded license since it
+    # is not a valid SPDX expression
+    return f'lookup-license found: {lic}'
+
+def valid_spdx(expr):
+    if expr in NO_LICENSE:
+        return False
+    try:
+        validated = LicenseDatabase.validate(expr)
+    except Exception:
+        return False
+    # e.g. "BSD3" is a valid license, but not an SPDX identifier
+    return ' '.join(validated['license_parsed'].split()) == ' '.join(expr.split())
+
+class CycloneDXDocument():
+
+    def __init__(self, document):
+        self.document = document
+
+    def __components(self, components):
+        for component in components or []:
+            yield component
+            yield from self.__components(component.get('components'))
+
+    def __has_license(self, component):
+        for lic in component.get('licenses', []):
+            if 'expression' in lic and valid_spdx(lic['expression']):
+                return True
+            if 'id' in lic.get('license', {}) and valid_spdx(lic['license']['id']):
+                return True
+        return False
+
+    def purls(self):
+        for component in self.__components(self.document.get('components')):
+            if component.get('purl') and not self.__has_license(component):
+                yield component['purl']
+
+    def write(self, fp, licenses):
+        for component in self.__components(self.document.get('components')):
+            lic = licenses.get(component.get('purl'))
+            if lic and not self.__has_license(component):
+                if valid_spdx(lic):
+                    component['licenses'] = [{'expression': lic}]
+                else:
+                    component['licenses'] = [{'license': {'name': lic}}]
+        json.dump(self.document, fp, indent=2)
+
+class SpdxJsonDocument():
+
+    def __init__(self, document):
+        self.document = document
+
+    def __purl(self, package):
+        for ref in package.get('externalRefs', []):
+            if ref.get('referenceType') == 'purl':
+                return ref.get('referenceLocator')
+        return None
+
+    def __has_license(self, package):
+        return valid_spdx(package.get('licenseConcluded')) or valid_spdx(package.get('licenseDeclared'))
+
+    def purls(self):
+        for package in self.document.get('packages', []):
+            purl = self.__purl(package)
+            if purl and not self.__has_license(package):
+                yield purl
+
+    def write(self, fp, licenses):
+        for package in self.document.get('packages', []):
+            lic = licenses.get(self.__purl(package))
+            if not lic or self.__has_license(package):
+                continue
+            if valid_spdx(lic):
+                package['licenseConcluded'] = lic
+            else:
+                package['licenseConcluded'] = 'NOASSERTION'
+                comments = [package['licenseComments']] if package.get('licenseComments') else []
+                package['licenseComments'] = '\n'.join(comments + [license_comment(lic)])
+        json.dump(self.document, fp, indent=2)
+
+class SpdxTagValueDocument():
+
+    def __init__(self, sbom_file):
+        self.sbom_file = sbom_file
+
+    def __tag_value(self, line):
+        tag, _, value = line.partition(':')
+        return tag.strip(), value.strip()
+
+    def __packages(self):
+        # yields the lines of each package (or other element) at a time
+        lines = []
+        with open(self.sbom_file) as fp:
+            for line in fp:
+                if lines and any(line.startswith(element) for element in SPDX_TAG_VALUE_ELEMENTS):
+                    yield lines
+                    lines = []
+                lines.append(line)
+        if lines:
+            yield lines
+
+    def __package_info(self, lines):
+        # returns (purl, has license) for a package
+        purl = None
+        has_license = False
+        for line in lines:
+            tag, value = self.__tag_value(line)
+            if tag == 'ExternalRef':
+                splits = value.split()
+                if len(splits) == 3 and splits[1] == 'purl':
+                    purl = splits[2]
+            elif tag in ['PackageLicenseConcluded', 'PackageLicenseDeclared']:
+                has_license = has_license or valid_spdx(value)
+        return purl, has_license
+
+    def purls(self):
+        for lines in self.__packages():
+            if not lines[0].startswith('PackageName:'):
+                continue
+            purl, has_license = self.__package_info(lines)
+            if purl and not has_license:
+                yield purl
+
+    def write(self, fp, licenses):
+        for lines in self.__packages():
+            if lines[0].startswith('PackageName:'):
+                purl, has_license = self.__package_info(lines)
+                lic = licenses.get(purl)
+                if lic and not has_license:
+                    lines = self.__set_license(lines, lic)
+            fp.writelines(lines)
+
+    def __set_license(self, lines, lic):
+        if valid_spdx(lic):
+            concluded = f'PackageLicenseConcluded: {lic}\n'
+            new_lines = [concluded]
+        else:
+            concluded = 'PackageLicenseConcluded: NOASSERTION\n'
+            new_lines = [concluded]
+            if any(line.startswith('PackageLicenseComments:') for line in lines):
+                logging.info(f'Not adding "{license_comment(lic)}", the package already has license comments')
+            else:
+                new_lines.append(f'PackageLicenseComments: <text>{license_comment(lic)}</text>\n')
+
+        updated = [concluded if line.startswith('PackageLicenseConcluded:') else line for line in lines]
+        new_lines = [line for line in new_lines if line not in updated]
+        if new_lines:
+            # after the last package information line, i.e. before
+            # e.g. relationships and comments following the package
+            last = max(index for index, line in enumerate(updated) if line.startswith(SPDX_TAG_VALUE_PACKAGE_TAGS))
+            if not updated[last].endswith('\n'):
+                updated[last] += '\n'
+            updated[last + 1:last + 1] = new_lines
+        return updated
+
+def sbom_document(sbom_file):
+    with open(sbom_file) as fp:
+        is_json = fp.read(4096).lstrip().startswith('{')
+    if not is_json:
+        return SpdxTagValueDocument(sbom_file)
+
+    with open(sbom_file) as fp:
+        document = json.load(fp)
+    if document.get('bomFormat') == 'CycloneDX':
+        return CycloneDXDocument(document)
+    if 'spdxVersion' in document:
+        return SpdxJsonDocument(document)
+    raise Exception(f'Could not identify the format of {sbom_file}, supported formats are CycloneDX JSON, SPDX JSON and SPDX tag-value.')
+
+def lookup_sbom(sbom_file, out_fp, workers=None):
+    document = sbom_document(sbom_file)
+
+    licenses = {}
+    failed = []
+    resolver = LookupURLResolver(workers)
+    for purl, result, error in resolver.resolve(document.purls()):
+        lic = None
+        if result:
+            lic = result.get('identified_license_string')
+        if lic:
+            licenses[purl] = lic
+        else:
+            logging.info(f'Could not identify the license of {purl}: {error}')
+            failed.append(purl)
+
+    document.write(out_fp, licenses)
+
+    return {
+        'identified': licenses,
+        'failed': failed,
+    }
@@ -0,0 +1,141 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+#
+# HTTP/JSON service, looking up licenses without starting a new
+# process (loading the license index etc) for every lookup.
+#
+# Requests are POSTed with a JSON object, with the text, file, url,
+# purl or package to lookup in "input", e.g:
+#
+#    curl -d '{"input": "BSD3"}' http://127.0.0.1:8000/text
+#    curl -d '{"input": "pkg:pypi/boto3@1.35.99"}' http://127.0.0.1:8000/purl
+#
+# and the resources are listed with:
+#
+#    curl http://127.0.0.1:8000/resources
+#
+# Files (/file) are only read in the server's working directory, or the
+# directories in config.server_file_directories.
+#
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import json
+import logging
+import os
+
+from lookup_license.lookuplicense import LookupLicense
+from lookup_license.lookupurl.factory import LookupURLFactory
+
+import lookup_license.config
+
+class LookupLicenseRequestHandler(BaseHTTPRequestHandler):
+
+    # path => url type (see LookupURLFactory)
+    URL_TYPES = {
+        '/url': 'url',
+        '/gitrepo': 'git',
+        '/swift': 'swift',
+        '/pypi': 'pypi',
+        '/gem': 'gem',
+        '/go': 'go',
+        '/maven': 'maven',
+    }
+
+    def __reply(self, code, data):
+        content = json.dumps(data).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def __request_data(self):
+        length = int(self.headers.get('Content-Length', 0))
+        data = json.loads(self.rfile.read(length) or '{}')
+        if not isinstance(data, dict):
+            raise ValueError('The request must be a JSON object.')
+        if 'input' not in data:
+            raise ValueError('Missing "input" in request.')
+        return data
+
+    def __check_file(self, license_file):
+        real_path = os.path.realpath(license_file)
+        for directory in self.server.file_directories:
+            if os.path.commonpath([real_path, directory]) == directory:
+                return
+        raise PermissionError(f'{license_file} is not in a directory served.')
+
+    def __lookup(self, path, data):
+        ll = self.server.lookup_license
+        lookup_input = data['input']
+        if path == '/text':
+            minimum_score = float(data.get('minimum_score', lookup_license.config.default_minimum_score))
+            return ll.lookup_license_text(lookup_input, minimum_score)
+        if path == '/file':
+            self.__check_file(lookup_input)
+            # the path, not the content of the file
+            return dict(ll.lookup_license_file(lookup_input), provided=lookup_input)
+        if path == '/purl':
+            return LookupURLFactory.lookupurl_url(lookup_input).lookup_url(lookup_input)
+        if path == '/validate-spdx':
+            return ll.validate(lookup_input)
+        return LookupURLFactory.lookupurl(self.URL_TYPES[path]).lookup_url(lookup_input)
+
+    def do_GET(self):
+        if self.path == '/resources':
+            self.__reply(200, self.server.lookup_license.list_resources())
+        elif self.path == '/version':
+            self.__reply(200, {'version': lookup_license.config.lookup_license_version})
+        else:
+            self.__reply(404, {'error': f'No such resource: {self.path}'})
+
+    def do_POST(self):
+        if self.path not in ['/text', '/file', '/purl', '/validate-spdx'] + list(self.URL_TYPES):
+            self.__reply(404, {'error': f'No such resource: {self.path}'})
+            return
+
+        try:
+            data = self.__request_data()
+        except ValueError as e:
+            self.__reply(400, {'error': f'Bad request: {e}'})
+            return
+
+        try:
+            self.__reply(200, self.__lookup(self.path, data))
+        except PermissionError as e:
+            self.__reply(403, {'error': str(e)})
+        except Exception as e:
+            logging.info(f'{self.path} {data["input"]} failed: {e}')
+            self.__reply(422, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        logging.info(f'{self.address_string()} {format % args}')
+
+class LookupLicenseServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, host=lookup_license.config.server_host, port=lookup_license.config.server_port, warm=True, file_directories=None):
+        self.lookup_license = LookupLicense()
+        file_directories = file_directories or lookup_license.config.server_file_directories or [os.getcwd()]
+        self.file_directories = [os.path.realpath(directory) for directory in file_directories]
+        if warm:
+            self.lookup_license.warm()
+        super().__init__((host, port), LookupLicenseRequestHandler)
+
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+def serve(host=lookup_license.config.server_host, port=lookup_license.config.server_port):
+    server = LookupLicenseServer(host, port)
+    logging.warning(f'Serving lookup-license at {server.url()}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -2,6 +2,8 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import hashlib
+
 def get_keypath(data, path):
     inner_data = data
     for sub_path in path.split('.'):
@@ -14,3 +16,13 @@ def get_keypath(data, path):
 def contains(url, strings):
     res = any(map(url.__contains__, strings))
     return res
+
+def normalize_text(text, fold_case=True):
+    # collapse all whitespace (incl. newlines) into single blanks
+    normalized = ' '.join(text.split())
+    if fold_case:
+        normalized = normalized.lower()
+    return normalized
+
+def text_digest(text, fold_case=True):
+    return hashlib.sha256(normalize_text(text, fold_case).encode('utf-8')).hexdigest()
@@ -0,0 +1,32 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import pytest
+
+import lookup_license.cache
+import lookup_license.config
+from lookup_license.cache import LookupLicenseCache
+
+def _reset_cache():
+    # the next LookupLicenseCache() creates a new (singleton) cache
+    cache = LookupLicenseCache.__dict__.get('llcache')
+    if cache:
+        cache.close()
+        del LookupLicenseCache.llcache
+
+@pytest.fixture(autouse=True)
+def tmp_cache(tmp_path, monkeypatch):
+    # each test uses a cache of its own, not the user's cache
+    monkeypatch.setattr(lookup_license.cache, 'cache_location', lambda: str(tmp_path / 'lookup-license-cache'))
+    monkeypatch.setattr(lookup_license.config, 'cache_url', None)
+    monkeypatch.delenv('LOOKUP_LICENSE_CACHE_URL', raising=False)
+    _reset_cache()
+    yield
+    _reset_cache()
+
+@pytest.fixture(autouse=True)
+def no_prefetch(monkeypatch):
+    # the providers are not looked up in batches (over the network)
+    # unless a test asks for it, e.g. with lookup_url monkeypatched
+    monkeypatch.setattr(lookup_license.config, 'resolver_prefetch', False)
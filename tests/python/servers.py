@@ -0,0 +1,21 @@
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from contextlib import contextmanager
+import threading
+
+@contextmanager
+def serve_in_thread(server):
+    # serves requests in a thread of its own, e.g:
+    #
+    #    with serve_in_thread(HTTPServer(('127.0.0.1', 0), Handler)) as server:
+    #        requests.get(f'http://127.0.0.1:{server.server_port}/')
+    #
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,190 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import gzip
+import json
+import pytest
+import subprocess
+import sys
+import time
+
+import lookup_license.cache
+import lookup_license.config
+from lookup_license.cache import CACHE_SCHEMA_VERSION
+from lookup_license.cache import LookupLicenseCache
+from lookup_license.cache import cache_entry_kind
+from lookup_license.cache import cache_entry_ttl
+from lookup_license.cache import canonical_url
+from lookup_license.cache import url_cache_key
+from lookup_license.lookupurl.pypi import Pypi
+
+def _tmp_cache(tmp_path, monkeypatch):
+    # another cache than the (singleton) cache of the test
+    monkeypatch.setattr(lookup_license.cache, 'cache_location', lambda: str(tmp_path))
+    cache = object.__new__(LookupLicenseCache)
+    cache._init_cache()
+    return cache
+
+def test_cache_entry_kind():
+    assert cache_entry_kind('lookup-license-text:scancode-32.5.0:abc:0.9') == 'text'
+    assert cache_entry_kind('http:https://pypi.org/pypi/boto3/json') == 'http'
+    assert cache_entry_kind('provider:https://api.clearlydefined.io/definitions/pypi/pypi/-/boto3/1.35.99') == 'provider'
+    assert cache_entry_kind('pkg:pypi/boto3@1.35.99') == 'pinned'
+    assert cache_entry_kind('https://github.com/hesa/lookup-license/tree/0.1.1') == 'pinned'
+    assert cache_entry_kind('pkg:pypi/boto3') == 'latest'
+    assert cache_entry_kind('https://github.com/hesa/lookup-license') == 'latest'
+    assert cache_entry_kind('pkg:npm/@scope/pkg') == 'latest'
+    assert cache_entry_kind('pkg:npm/%40scope/pkg') == 'latest'
+    assert cache_entry_kind('pkg:npm/@scope/pkg@1.0.0') == 'pinned'
+    assert cache_entry_kind('pkg:deb/debian/curl@1:7.88?arch=amd64') == 'pinned'
+    assert cache_entry_kind('git@github.com:hesa/lookup-license') == 'latest'
+    assert cache_entry_kind('https://user@github.com/hesa/lookup-license') == 'latest'
+    assert cache_entry_kind(url_cache_key('npm', 'pkg:npm/%40scope/pkg')) == 'latest'
+    assert cache_entry_kind(url_cache_key('git', 'git@github.com:hesa/lookup-license')) == 'latest'
+
+def test_cache_entry_ttl():
+    assert cache_entry_ttl('lookup-license-text:abc') is None
+    assert cache_entry_ttl('pkg:pypi/boto3@1.35.99') == lookup_license.config.cache_ttls['pinned']
+    assert cache_entry_ttl('pkg:pypi/boto3') == lookup_license.config.cache_ttls['latest']
+
+def test_cache_stats(tmp_path, monkeypatch):
+    cache = _tmp_cache(tmp_path, monkeypatch)
+    cache.add('pkg:pypi/boto3@1.35.99', {'license': 'Apache-2.0'})
+    cache.add('pkg:pypi/boto3@1.35.99', {'license': 'Apache-2.0'})
+    cache.get('pkg:pypi/boto3@1.35.99')
+    cache.get_stored('pkg:pypi/no-such-package')
+
+    stats = cache.stats()
+    assert stats['entries'] == 1
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['evicted'] == 0
+    assert stats['size_limit'] == lookup_license.config.cache_size_limit
+    assert stats['eviction_policy'] == lookup_license.config.cache_eviction_policy
+    assert list(cache.list_cache()) == ['pkg:pypi/boto3@1.35.99']
+    cache.close()
+
+def test_cache_expire(tmp_path, monkeypatch):
+    monkeypatch.setitem(lookup_license.config.cache_ttls, 'latest', 0.1)
+    cache = _tmp_cache(tmp_path, monkeypatch)
+    cache.add('pkg:pypi/boto3', {'license': 'Apache-2.0'})
+    cache.add('pkg:pypi/boto3@1.35.99', {'license': 'Apache-2.0'})
+    time.sleep(0.2)
+
+    with pytest.raises(KeyError):
+        cache.get('pkg:pypi/boto3')
+    assert cache.get('pkg:pypi/boto3@1.35.99') == {'license': 'Apache-2.0'}
+    cache.cache.cull()
+    # expired, not evicted
+    assert cache.stats()['evicted'] == 0
+    assert cache.stats()['entries'] == 1
+    cache.close()
+
+def test_cache_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(lookup_license.config, 'cache_size_limit', 100000)
+    cache = _tmp_cache(tmp_path, monkeypatch)
+    for i in range(20):
+        cache.add(f'pkg:pypi/package-{i}@1.0', {'license': 'x' * 10000})
+    cache.cache.cull()
+    stats = cache.stats()
+    assert stats['evicted'] > 0
+    assert stats['entries'] + stats['evicted'] == 20
+    cache.close()
+
+def test_canonical_url():
+    assert canonical_url('pkg:PyPI/Foo_Bar@1.0') == 'pkg:pypi/foo-bar@1.0'
+    assert canonical_url('pkg:pypi/foo-bar@1.0') == 'pkg:pypi/foo-bar@1.0'
+    assert canonical_url('https://GitHub.com/hesa/Lookup-License/') == 'github.com/hesa/Lookup-License'
+    assert canonical_url('http://github.com/hesa/Lookup-License') == 'github.com/hesa/Lookup-License'
+    assert canonical_url('github.com/hesa/Lookup-License/') == 'github.com/hesa/Lookup-License'
+    assert canonical_url(' boto3 ') == 'boto3'
+
+def test_url_cache_key():
+    assert url_cache_key('pypi', 'pkg:pypi/Foo') == url_cache_key('pypi', 'pkg:pypi/foo')
+    assert url_cache_key('pypi', 'foo') != url_cache_key('gem', 'foo')
+    assert cache_entry_kind(url_cache_key('pypi', 'pkg:pypi/foo@1.0')) == 'pinned'
+
+def test_cache_schema(tmp_path, monkeypatch):
+    cache = _tmp_cache(tmp_path, monkeypatch)
+    # stored by an older lookup-license, without schema
+    cache.cache.set('pkg:pypi/boto3@1.35.99', {'license': 'old'})
+    with pytest.raises(Exception):
+        cache.get('pkg:pypi/boto3@1.35.99')
+
+    cache.add('pkg:pypi/boto3@1.35.99', {'license': 'Apache-2.0'})
+    assert cache.get('pkg:pypi/boto3@1.35.99') == {'license': 'Apache-2.0'}
+    assert cache.cache.get('pkg:pypi/boto3@1.35.99')['schema'] == CACHE_SCHEMA_VERSION
+    cache.close()
+
+def test_lookup_url_canonical_key():
+    name = f'cache-test-{time.time_ns()}'
+    data = {'provided': f'pkg:pypi/{name}@1.0', 'identified_license_string': 'MIT'}
+    LookupLicenseCache().add(url_cache_key(Pypi.cache_namespace, f'pkg:pypi/{name}@1.0'), data)
+
+    result = Pypi().lookup_url(f'pkg:PyPI/{name.upper()}@1.0')
+    assert result['identified_license_string'] == 'MIT'
+    assert result['provided'] == f'pkg:PyPI/{name.upper()}@1.0'
+
+def test_export_import_cache(tmp_path, monkeypatch):
+    cache = _tmp_cache(tmp_path / 'exported', monkeypatch)
+    cache.add(url_cache_key('pypi', 'pkg:pypi/boto3@1.35.99'), {'identified_license_string': 'Apache-2.0'})
+    cache.store('http:https://pypi.org/pypi/boto3/json', {'etag': None})
+    assert cache.export_cache(tmp_path / 'cache.jsonl.gz') == 1
+    cache.close()
+
+    cache = _tmp_cache(tmp_path / 'imported', monkeypatch)
+    assert cache.import_cache(tmp_path / 'cache.jsonl.gz') == 1
+    assert cache.get(url_cache_key('pypi', 'pkg:pypi/boto3@1.35.99')) == {'identified_license_string': 'Apache-2.0'}
+    assert cache.get_stored('http:https://pypi.org/pypi/boto3/json') is None
+    # already in the cache
+    assert cache.import_cache(tmp_path / 'cache.jsonl.gz') == 0
+    cache.disable()
+    assert cache.import_cache(tmp_path / 'cache.jsonl.gz') == 0
+    cache.close()
+
+def test_import_cache_no_expire(tmp_path, monkeypatch):
+    monkeypatch.setitem(lookup_license.config.cache_ttls, 'latest', 0.1)
+    cache = _tmp_cache(tmp_path / 'exported', monkeypatch)
+    cache.add(url_cache_key('pypi', 'pkg:pypi/boto3'), {'identified_license_string': 'Apache-2.0'})
+    cache.add(url_cache_key('pypi', 'pkg:pypi/rich'), {'identified_license_string': 'MIT'})
+    assert cache.export_cache(tmp_path / 'cache.jsonl.gz') == 2
+    cache.close()
+
+    expiring = _tmp_cache(tmp_path / 'expiring', monkeypatch)
+    assert expiring.import_cache(tmp_path / 'cache.jsonl.gz') == 2
+    cache = _tmp_cache(tmp_path / 'imported', monkeypatch)
+    assert cache.import_cache(tmp_path / 'cache.jsonl.gz', expire=False) == 2
+    time.sleep(0.2)
+    with pytest.raises(KeyError):
+        expiring.get(url_cache_key('pypi', 'pkg:pypi/boto3'))
+    assert cache.get(url_cache_key('pypi', 'pkg:pypi/boto3')) == {'identified_license_string': 'Apache-2.0'}
+    expiring.close()
+    cache.close()
+
+def test_import_cache_bad_file(tmp_path, monkeypatch):
+    with gzip.open(tmp_path / 'cache.jsonl.gz', 'wt') as fp:
+        fp.write(json.dumps({'format': 'lookup-license-cache', 'version': 1, 'schema': -1}) + '\n')
+    cache = _tmp_cache(tmp_path / 'cache', monkeypatch)
+    with pytest.raises(Exception):
+        cache.import_cache(tmp_path / 'cache.jsonl.gz')
+    cache.close()
+
+def test_prewarm(tmp_path):
+    # a cache imported on a host without network
+    cache_url = f'sqlite://{tmp_path}/cache.db'
+    with gzip.open(tmp_path / 'cache.jsonl.gz', 'wt') as fp:
+        fp.write(json.dumps({'format': 'lookup-license-cache', 'version': 1, 'schema': CACHE_SCHEMA_VERSION}) + '\n')
+        fp.write(json.dumps({'key': url_cache_key('pypi', 'pkg:pypi/boto3@1.35.99'),
+                             'value': {'provided': 'pkg:pypi/boto3@1.35.99', 'identified_license_string': 'Apache-2.0'}}) + '\n')
+    subprocess.check_output([sys.executable, '-m', 'lookup_license', '--cache-url', cache_url, '--import-cache', str(tmp_path / 'cache.jsonl.gz')])
+
+    (tmp_path / 'purls.txt').write_text('pkg:pypi/boto3@1.35.99\nnot-a-purl\n')
+    process = subprocess.run([sys.executable, '-m', 'lookup_license', '--cache-url', cache_url, '--prewarm', str(tmp_path / 'purls.txt')],
+                             stdout=subprocess.PIPE)
+    assert process.returncode == 1
+    summary = json.loads(process.stdout)
+    assert summary['resolved'] == 1
+    assert list(summary['failed']) == ['not-a-purl']
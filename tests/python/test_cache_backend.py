@@ -0,0 +1,238 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import multiprocessing
+import os
+import pytest
+import requests
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import lookup_license.config
+from lookup_license.cache import LookupLicenseCache
+from lookup_license.cache_backend import DiskCacheBackend
+from lookup_license.cache_backend import HttpCacheBackend
+from lookup_license.cache_backend import SqliteCacheBackend
+from lookup_license.cache_backend import cache_backend
+from lookup_license.cache_server import CacheServer
+from servers import serve_in_thread
+
+def _check_backend(backend):
+    assert backend.add('pkg:pypi/boto3@1.35.99', {'license': 'Apache-2.0'})
+    assert not backend.add('pkg:pypi/boto3@1.35.99', {'license': 'MIT'})
+    assert backend.get('pkg:pypi/boto3@1.35.99') == {'license': 'Apache-2.0'}
+    backend.set('pkg:pypi/boto3@1.35.99', {'license': 'MIT'})
+    assert backend.get('pkg:pypi/boto3@1.35.99') == {'license': 'MIT'}
+    assert backend.get('pkg:pypi/no-such-package') is None
+    assert backend.get('pkg:pypi/no-such-package', 'default') == 'default'
+
+    assert backend.incr('counter') == 1
+    assert backend.incr('counter') == 2
+    assert sorted(backend.keys()) == ['counter', 'pkg:pypi/boto3@1.35.99']
+
+    backend.add('pkg:pypi/boto3', {'license': 'Apache-2.0'}, expire=0.1)
+    time.sleep(0.2)
+    assert backend.get('pkg:pypi/boto3') is None
+    assert backend.add('pkg:pypi/boto3', {'license': 'Apache-2.0'})
+
+    backend.delete('pkg:pypi/boto3')
+    assert backend.get('pkg:pypi/boto3') is None
+    assert backend.evictions() == 0
+    hits, misses = backend.stats()
+    assert hits == 2
+    assert misses == 4
+    assert backend.volume() > 0
+
+    backend.clear()
+    assert list(backend.keys()) == []
+
+def test_diskcache_backend(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path))
+    _check_backend(backend)
+    backend.close()
+
+def test_diskcache_backend_reads_do_not_write(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path))
+    backend.set('key', 'value')
+    # data_version changes when another connection commits
+    other = sqlite3.connect(str(tmp_path / 'cache.db'))
+    version = other.execute('PRAGMA data_version').fetchone()
+    assert backend.get('key') == 'value'
+    assert backend.get('no-such-key') is None
+    assert backend.evictions() == 0
+    assert other.execute('PRAGMA data_version').fetchone() == version
+    other.close()
+    assert backend.stats() == (1, 1)
+    backend.close()
+
+def test_sqlite_backend(tmp_path):
+    backend = SqliteCacheBackend(str(tmp_path / 'cache.db'))
+    _check_backend(backend)
+    backend.close()
+
+def test_sqlite_backend_size_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(lookup_license.config, 'cache_size_limit', 10000)
+    backend = SqliteCacheBackend(str(tmp_path / 'cache.db'))
+    for i in range(20):
+        backend.set(f'key-{i}', 'x' * 1000)
+    backend.cull()
+    assert backend.volume() <= 10000
+    # the least recently stored are evicted
+    assert backend.get('key-0') is None
+    assert backend.get('key-19') == 'x' * 1000
+    assert backend.evictions() == 20 - len([key for key in backend.keys() if key.startswith('key-')])
+    backend.close()
+
+def _sqlite_writer(path):
+    backend = SqliteCacheBackend(path)
+    added = 0
+    for i in range(50):
+        backend.incr('counter')
+        added += backend.add(f'key-{i}', i)
+    backend.close()
+    return added
+
+def test_sqlite_backend_processes(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    SqliteCacheBackend(path).close()
+    with multiprocessing.get_context('spawn').Pool(4) as pool:
+        added = pool.map(_sqlite_writer, [path] * 4)
+
+    backend = SqliteCacheBackend(path)
+    assert backend.get('counter') == 200
+    # each key added by one of the processes only
+    assert sum(added) == 50
+    backend.close()
+
+_forked_backend = None
+
+def _forked_writer(i):
+    # the backend (and its connection) inherited from the parent process
+    _forked_backend.set(f'forked-{i}', i)
+    return _forked_backend.get(f'forked-{i}')
+
+def test_sqlite_backend_fork(tmp_path):
+    global _forked_backend
+    _forked_backend = SqliteCacheBackend(str(tmp_path / 'cache.db'))
+    _forked_backend.set('parent', 'before fork')
+    with multiprocessing.get_context('fork').Pool(2) as pool:
+        assert pool.map(_forked_writer, range(4)) == [0, 1, 2, 3]
+
+    assert _forked_backend.get('parent') == 'before fork'
+    assert _forked_backend.get('forked-3') == 3
+    _forked_backend.close()
+
+def test_sqlite_backend_reads_do_not_write(tmp_path):
+    backend = SqliteCacheBackend(str(tmp_path / 'cache.db'))
+    backend.set('key', 'value')
+    # data_version changes when another connection commits
+    other = sqlite3.connect(str(tmp_path / 'cache.db'))
+    version = other.execute('PRAGMA data_version').fetchone()
+    assert backend.get('key') == 'value'
+    assert backend.get('no-such-key') is None
+    assert other.execute('PRAGMA data_version').fetchone() == version
+    backend.set('key', 'new value')
+    assert other.execute('PRAGMA data_version').fetchone() != version
+    other.close()
+    assert backend.stats() == (1, 1)
+    backend.close()
+
+def test_sqlite_backend_json(tmp_path):
+    backend = SqliteCacheBackend(str(tmp_path / 'cache.db'))
+    backend.set('key', {'identified_license': {'MIT', 'BSD-3-Clause'}})
+    assert backend.get('key') == {'identified_license': ['BSD-3-Clause', 'MIT']}
+    backend.close()
+    other = sqlite3.connect(str(tmp_path / 'cache.db'))
+    assert other.execute('SELECT value FROM entries').fetchone() == ('{"identified_license": ["BSD-3-Clause", "MIT"]}',)
+    other.close()
+
+def test_sqlite_backend_pickled(tmp_path):
+    # a database written by an older lookup-license, with pickled values
+    old = sqlite3.connect(str(tmp_path / 'cache.db'))
+    old.execute('CREATE TABLE entries (key TEXT PRIMARY KEY, value BLOB, size INTEGER, stored REAL, expire REAL)')
+    old.execute('INSERT INTO entries VALUES (?, ?, 1, 0, NULL)', ('key', b'\x80\x04K\x01.'))
+    old.commit()
+    old.close()
+    backend = SqliteCacheBackend(str(tmp_path / 'cache.db'))
+    assert backend.get('key') is None
+    assert backend.add('key', 'value')
+    backend.close()
+
+def test_sqlite_backend_threads(tmp_path):
+    backend = SqliteCacheBackend(str(tmp_path / 'cache.db'))
+    threads = [threading.Thread(target=lambda: [backend.incr('counter') for _ in range(50)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert backend.get('counter') == 200
+    backend.close()
+
+@pytest.fixture
+def cache_server(tmp_path):
+    with serve_in_thread(CacheServer(SqliteCacheBackend(str(tmp_path / 'server.db')), '127.0.0.1', 0)) as server:
+        yield server
+    server.backend.close()
+
+def test_http_backend(cache_server):
+    _check_backend(HttpCacheBackend(cache_server.url()))
+
+def test_http_backend_shared(cache_server, monkeypatch):
+    # two caches (e.g. on two hosts) using the same server
+    monkeypatch.setattr(lookup_license.config, 'cache_url', cache_server.url())
+    first = object.__new__(LookupLicenseCache)
+    first._init_cache()
+    second = object.__new__(LookupLicenseCache)
+    second._init_cache()
+
+    first.add('pkg:pypi/boto3@1.35.99', {'license': 'Apache-2.0'})
+    assert second.get('pkg:pypi/boto3@1.35.99') == {'license': 'Apache-2.0'}
+    assert list(second.list_cache()) == ['pkg:pypi/boto3@1.35.99']
+    stats = second.stats()
+    assert stats['backend'] == 'http'
+    assert stats['entries'] == 1
+
+def test_http_backend_sets(cache_server):
+    backend = HttpCacheBackend(cache_server.url())
+    backend.set('key', {'identified_license': {'MIT', 'BSD-3-Clause'}})
+    assert backend.get('key') == {'identified_license': ['BSD-3-Clause', 'MIT']}
+
+def test_http_backend_not_a_cache_server(cache_server):
+    backend = HttpCacheBackend(f'{cache_server.url()}/no-such-path')
+    with pytest.raises(requests.exceptions.HTTPError):
+        backend.add('key', 'value')
+    assert backend.get('key') is None
+
+def test_http_backend_unreachable():
+    # lookups work, without the cache, with the cache server down
+    code = 'from lookup_license.lookuplicense import LookupLicense; print(LookupLicense().lookup_license_text("Apache-2.0")["normalized"])'
+    env = dict(os.environ, LOOKUP_LICENSE_CACHE_URL='http://127.0.0.1:1')
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, check=True)
+    assert output.stdout.decode().strip() == "['Apache-2.0']"
+    # one warning, no retries
+    assert output.stderr.decode().count('Could not reach the cache') == 1
+    assert 'Retrying' not in output.stderr.decode()
+
+def test_http_backend_unavailable():
+    backend = HttpCacheBackend('http://127.0.0.1:1')
+    start = time.monotonic()
+    assert backend.get('key') is None
+    assert not backend.available
+    # not tried again
+    assert not backend.add('key', 'value')
+    assert list(backend.keys()) == []
+    assert backend.stats() == (0, 0)
+    assert time.monotonic() - start < 2
+
+def test_cache_backend_url(tmp_path):
+    assert isinstance(cache_backend(None, str(tmp_path)), DiskCacheBackend)
+    assert isinstance(cache_backend(f'sqlite://{tmp_path}/cache.db', None), SqliteCacheBackend)
+    assert isinstance(cache_backend('http://127.0.0.1:8001', None), HttpCacheBackend)
+    with pytest.raises(Exception):
+        cache_backend('ftp://127.0.0.1', None)
@@ -4,10 +4,18 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
 import json
 import pytest
 
+from lookup_license.cache import LookupLicenseCache
 from lookup_license.lookupurl.clearlydefined import ClearlyDefined
+from lookup_license.lookupurl.purldb import PurlDB
+from lookup_license.resolver import LookupURLResolver
+from lookup_license.retrieve import Retriever
+import lookup_license.config
+from servers import serve_in_thread
 
 cd = ClearlyDefined()
 
@@ -29,4 +37,121 @@ def test_parameters_gem():
 def test_parameters_maven():
     coord_url = cd.parameters_to_url('maven', 'mavencentral', 'org.apache.httpcomponents/httpcore', '4.3')
     assert 'https://api.clearlydefined.io/definitions/maven/mavencentral/org.apache.httpcomponents/httpcore/4.3' == coord_url
-   
+
+def _definition(expressions):
+    return {'licensed': {'facets': {'core': {'discovered': {'expressions': expressions}}}}}
+
+class _DefinitionsHandler(BaseHTTPRequestHandler):
+    # stand-in for POST https://api.clearlydefined.io/definitions
+    definitions = {
+        'pypi/pypi/-/boto3/1.35.99': _definition(['Apache-2.0']),
+        'gem/rubygems/-/rails/7.0.4': _definition(['MIT']),
+        'pypi/pypi/-/no-license/1.0': {'licensed': {}},
+    }
+
+    def do_POST(self):
+        coordinates = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append(coordinates)
+        if 'pypi/pypi/-/fail/1.0' in coordinates:
+            self.send_response(500)
+            self.end_headers()
+            return
+        # unknown coordinates get an empty definition
+        body = json.dumps({coordinate: self.definitions.get(coordinate, {}) for coordinate in coordinates}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def definitions_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _DefinitionsHandler)
+    server.requests = []
+    with serve_in_thread(server):
+        yield server
+
+def test_lookup_license_packages(definitions_server):
+    cd = ClearlyDefined(f'http://127.0.0.1:{definitions_server.server_port}')
+    results = cd.lookup_license_packages([
+        ('pypi/pypi', None, 'boto3', '1.35.99'),
+        ('gem/rubygems', None, 'rails', '7.0.4'),
+        ('pypi/pypi', None, 'no-license', '1.0'),
+        ('pypi/pypi', None, 'unknown', '1.0'),
+        ('pypi/pypi', None, 'boto3', '1.35.99'),
+    ], chunk_size=2)
+
+    assert [result['license'] for result in results] == ['Apache-2.0', 'MIT', None, None, 'Apache-2.0']
+    assert [result['status'] for result in results] == [True, True, False, False, True]
+    assert results[0]['data_url'] == f'http://127.0.0.1:{definitions_server.server_port}/definitions/pypi/pypi/-/boto3/1.35.99'
+    assert results[3]['error_message']
+    # 4 different coordinates, 2 per request
+    assert sorted(len(coordinates) for coordinates in definitions_server.requests) == [2, 2]
+
+def test_lookup_license_packages_failed_chunk(definitions_server):
+    cd = ClearlyDefined(f'http://127.0.0.1:{definitions_server.server_port}')
+    results = cd.lookup_license_packages([
+        ('pypi/pypi', None, 'boto3', '1.35.99'),
+        ('pypi/pypi', None, 'fail', '1.0'),
+        ('gem/rubygems', None, 'rails', '7.0.4'),
+    ], chunk_size=2)
+
+    # the chunk with the failing coordinate fails, the other one not
+    assert [result['license'] for result in results] == [None, None, 'MIT']
+    assert 'status code: 500' in results[0]['error_message']
+
+def test_lookup_license_packages_bad_purl(definitions_server):
+    cd = ClearlyDefined(f'http://127.0.0.1:{definitions_server.server_port}')
+    results = cd.lookup_license_packages(['not-a-purl'])
+
+    assert results[0]['license'] is None
+    assert results[0]['error_message'] == 'Could not convert not-a-purl to a coordinate.'
+    assert definitions_server.requests == []
+
+def _no_download(self, url):
+    raise Exception(f'{url} downloaded')
+
+def test_lookup_license_packages_stored(definitions_server, monkeypatch):
+    cd = ClearlyDefined(f'http://127.0.0.1:{definitions_server.server_port}')
+    assert cd.prefetch_packages([
+        ('pypi/pypi', '-', 'boto3', '1.35.99'),
+        ('pypi/pypi', '-', 'unknown', '1.0'),
+    ]) == 2
+
+    # the definitions looked up in the batch are not downloaded again
+    monkeypatch.setattr(Retriever, 'download_url', _no_download)
+    result = cd.lookup_license_package('pkg:pypi/boto3@1.35.99', 'pypi/pypi', '-', 'boto3', '1.35.99')
+    assert result['license'] == 'Apache-2.0'
+    assert result['data_url'] == f'http://127.0.0.1:{definitions_server.server_port}/definitions/pypi/pypi/-/boto3/1.35.99'
+    assert cd.prefetch_packages([('pypi/pypi', '-', 'boto3', '1.35.99')]) == 0
+    assert len(definitions_server.requests) == 1
+
+    # but when updating the cache
+    LookupLicenseCache().set_update_mode()
+    result = cd.lookup_license_package('pkg:pypi/boto3@1.35.99', 'pypi/pypi', '-', 'boto3', '1.35.99')
+    assert result['license'] is None
+    assert result['error_message'].startswith('Could not download')
+
+def test_resolve_prefetch(definitions_server, monkeypatch):
+    monkeypatch.setattr(lookup_license.config, 'clearlydefined_api_url', f'http://127.0.0.1:{definitions_server.server_port}')
+    monkeypatch.setattr(lookup_license.config, 'resolver_prefetch', True)
+    monkeypatch.setattr(Retriever, 'download_url', _no_download)
+    monkeypatch.setattr(PurlDB, 'lookup_license_package_impl', lambda self, *args, **kwargs: {'license': None, 'data_url': None, 'error_message': None})
+
+    class _ProvidersResolver(LookupURLResolver):
+        # the providers' part of the lookups
+        def lookup_url(self, url):
+            handler = self.handler(url)
+            return handler.lookup_providers(url, handler.version_hint(url))
+
+    urls = ['pkg:pypi/boto3@1.35.99', 'pkg:gem/rails@7.0.4', 'pkg:pypi/boto3']
+    results = {url: result for url, result, error in _ProvidersResolver(workers=2).resolve(urls)}
+
+    # the purls with a version looked up in one request, the one
+    # without when its version is known
+    assert definitions_server.requests == [['pypi/pypi/-/boto3/1.35.99', 'gem/rubygems/-/rails/7.0.4']]
+    assert results['pkg:pypi/boto3@1.35.99']['https://clearlydefined.io']['license'] == 'Apache-2.0'
+    assert results['pkg:gem/rails@7.0.4']['https://clearlydefined.io']['license'] == 'MIT'
@@ -0,0 +1,76 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import pytest
+import subprocess
+import sys
+
+import lookup_license.config
+from lookup_license.license_db import LicenseDatabase
+
+def test_expression_license_memoized():
+    first = LicenseDatabase.expression_license('GPLv2+')
+    hits = LicenseDatabase.cache_info()['expression_license']['hits']
+    first['identified_license'] = 'changed by caller'
+    second = LicenseDatabase.expression_license('GPLv2+')
+    assert second['identified_license'] == 'GPL-2.0-or-later'
+    assert LicenseDatabase.expression_license_identified('GPLv2+') == 'GPL-2.0-or-later'
+    assert LicenseDatabase.cache_info()['expression_license']['hits'] == hits + 2
+
+def test_validate_memoized():
+    assert LicenseDatabase.validate('MIT')['identified_license'] == 'MIT'
+    assert LicenseDatabase.validate('MIT')['identified_license'] == 'MIT'
+    assert LicenseDatabase.cache_info()['validate']['hits'] >= 1
+    with pytest.raises(Exception):
+        LicenseDatabase.validate('MIT AND no-such-license')
+
+def test_license_names_table():
+    from lookup_license.license_names import lookup_license_name
+    for name in ['BSD3', 'MIT', 'License :: OSI Approved :: MIT License', 'GPLv2+']:
+        assert lookup_license_name(name) == LicenseDatabase.foss_licenses().expression_license(name, update_dual=False)
+    assert lookup_license_name('no such license name') is None
+
+def test_license_names_other_flame_data(monkeypatch):
+    # foss-flame with other license data, but the same version
+    import lookup_license.license_names
+    monkeypatch.setattr(lookup_license.license_names, 'license_names', None)
+    monkeypatch.setattr(lookup_license.license_names, 'rebuild_thread', None)
+    monkeypatch.setattr(lookup_license.license_names, '_flame_data_digest', 'other-flame-data')
+    monkeypatch.setattr(lookup_license.license_names, 'build_license_names', lambda fl: {
+        'flame_version': lookup_license.license_names.flame_version(),
+        'flame_data': 'other-flame-data',
+        'license_names': {'MIT': {'identified_license': 'MIT'}},
+    })
+
+    # not served from the (stale) table while rebuilding
+    assert lookup_license.license_names.lookup_license_name('BSD3') is None
+    lookup_license.license_names.rebuild_thread.join()
+    assert os.path.exists(lookup_license.license_names.rebuilt_license_names_file())
+    assert lookup_license.license_names.lookup_license_name('MIT') == {'queried_license': 'MIT', 'identified_license': 'MIT'}
+
+    # read from the cache directory by the next process
+    monkeypatch.setattr(lookup_license.license_names, 'license_names', None)
+    monkeypatch.setattr(lookup_license.license_names, 'rebuild_thread', None)
+    assert lookup_license.license_names.lookup_license_name('MIT') == {'queried_license': 'MIT', 'identified_license': 'MIT'}
+    assert lookup_license.license_names.rebuild_thread is None
+
+def test_foss_licenses_lazy():
+    code = 'import sys; from lookup_license.license_db import LicenseDatabase; print("flame" in sys.modules)'
+    assert subprocess.check_output([sys.executable, '-c', code]).decode().strip() == 'False'
+
+def test_flame_snapshot(monkeypatch, tmp_path):
+    import lookup_license.license_db
+    snapshot_file = str(tmp_path / 'flame.pickle')
+    monkeypatch.setattr(lookup_license.config, 'flame_snapshot', True)
+    monkeypatch.setattr(lookup_license.license_db, 'flame_snapshot_file', lambda: snapshot_file)
+
+    # written at first load, read at the next
+    written = lookup_license.license_db._load_foss_licenses()
+    assert os.path.exists(snapshot_file)
+    read = lookup_license.license_db._load_foss_licenses()
+    assert read is not written
+    assert read.expression_license('BSD3', update_dual=False)['identified_license'] == 'BSD-3-Clause'
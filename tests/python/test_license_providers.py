@@ -0,0 +1,76 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import time
+
+import lookup_license.config
+from lookup_license.lookupurl.license_provider import LicenseProvider
+from lookup_license.lookupurl.license_providers import LicenseProviders
+
+class _SleepingProvider(LicenseProvider):
+
+    def __init__(self, name, seconds):
+        self.provider_name = name
+        self.seconds = seconds
+
+    def name(self):
+        return self.provider_name
+
+    def lookup_license_package_impl(self, orig_url, pkg_type, pkg_namespace, pkg_name, pkg_version, pkg_qualifiers=None, pkg_subpath=None):
+        time.sleep(self.seconds)
+        return {
+            'license': 'MIT',
+            'data_url': f'{self.provider_name}/{pkg_name}',
+            'error_message': None,
+        }
+
+class _FailingProvider(_SleepingProvider):
+
+    def lookup_license_package_impl(self, orig_url, pkg_type, pkg_namespace, pkg_name, pkg_version, pkg_qualifiers=None, pkg_subpath=None):
+        time.sleep(self.seconds)
+        raise ConnectionError(f'{self.provider_name} is down')
+
+def test_lookup_license_package_concurrent():
+    providers = LicenseProviders()
+    providers.provider_list = [_SleepingProvider('first', 0.5), _SleepingProvider('second', 0.5)]
+    start = time.monotonic()
+    res = providers.lookup_license_package('pkg:pypi/boto3@1.0', 'pypi/pypi', None, 'boto3', '1.0')
+
+    assert time.monotonic() - start < 0.9
+    assert res['first']['license'] == 'MIT'
+    assert res['second']['license'] == 'MIT'
+    assert res['first']['answered']
+    assert res['first']['elapsed'] >= 0.5
+
+def test_lookup_license_package_timeout(monkeypatch):
+    monkeypatch.setattr(lookup_license.config, 'provider_timeout', 0.5)
+    providers = LicenseProviders()
+    providers.provider_list = [_SleepingProvider('fast', 0), _SleepingProvider('slow', 3)]
+    start = time.monotonic()
+    res = providers.lookup_license_package('pkg:pypi/boto3@1.0', 'pypi/pypi', None, 'boto3', '1.0')
+
+    assert time.monotonic() - start < 2
+    assert res['fast']['status']
+    assert res['fast']['answered']
+    assert not res['slow']['status']
+    assert not res['slow']['answered']
+    assert res['slow']['error'] == 'timeout after 0.5 seconds'
+    assert res['slow']['license'] is None
+
+def test_lookup_license_package_failing():
+    providers = LicenseProviders()
+    providers.provider_list = [_SleepingProvider('working', 0), _FailingProvider('failing', 0.1)]
+    res = providers.lookup_license_package('pkg:pypi/boto3@1.0', 'pypi/pypi', None, 'boto3', '1.0')
+
+    assert res['working']['license'] == 'MIT'
+    assert not res['failing']['status']
+    assert not res['failing']['answered']
+    assert res['failing']['error'] == 'ConnectionError: failing is down'
+    assert res['working']['answered']
+    assert 'error' not in res['working']
+    assert res['failing']['elapsed'] >= 0.1
+    assert res['failing']['license'] is None
+    assert 'failing is down' in res['failing']['error_message']
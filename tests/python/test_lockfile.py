@@ -0,0 +1,111 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from lookup_license.lockfile import lockfiles_purls
+from lookup_license.lookupurl.factory import LookupURLFactory
+from lookup_license.lookupurl.gem import Gem
+from lookup_license.lookupurl.go import Go
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+def test_requirements(tmp_path):
+    lockfile = _write(tmp_path, 'requirements.txt', '\n'.join([
+        '# comment',
+        'Requests==2.28.1',
+        'zope.interface==5.0 ; python_version > "3.6"',
+        'boto3[crt]==1.35.99 \\',
+        '    --hash=sha256:abc',
+        'packageurl_python',
+        '-r other.txt',
+    ]))
+    assert list(lockfiles_purls([lockfile])) == [
+        'pkg:pypi/requests@2.28.1',
+        'pkg:pypi/zope-interface@5.0',
+        'pkg:pypi/boto3@1.35.99',
+        'pkg:pypi/packageurl-python',
+    ]
+
+def test_poetry_lock(tmp_path):
+    lockfile = _write(tmp_path, 'poetry.lock', '\n'.join([
+        '[[package]]',
+        'name = "certifi"',
+        'version = "2024.2.2"',
+        '',
+        '[package.dependencies]',
+        'version = "not a package"',
+        '',
+        '[[package]]',
+        'name = "Jinja2"',
+        'version = "3.1.3"',
+        '',
+        '[metadata]',
+        'lock-version = "2.0"',
+    ]))
+    assert list(lockfiles_purls([lockfile])) == [
+        'pkg:pypi/certifi@2024.2.2',
+        'pkg:pypi/jinja2@3.1.3',
+    ]
+
+def test_gemfile_lock(tmp_path):
+    lockfile = _write(tmp_path, 'Gemfile.lock', '\n'.join([
+        'GEM',
+        '  remote: https://rubygems.org/',
+        '  specs:',
+        '    actioncable (7.0.4)',
+        '      actionpack (= 7.0.4)',
+        '    nio4r (2.5.8)',
+        '',
+        'PLATFORMS',
+        '  ruby',
+    ]))
+    assert list(lockfiles_purls([lockfile])) == [
+        'pkg:gem/actioncable@7.0.4',
+        'pkg:gem/nio4r@2.5.8',
+    ]
+
+def test_go(tmp_path):
+    go_mod = _write(tmp_path, 'go.mod', '\n'.join([
+        'module example.com/app',
+        'go 1.21',
+        'require github.com/gorilla/mux v1.8.0',
+        'require (',
+        '    golang.org/x/text v0.14.0 // indirect',
+        ')',
+    ]))
+    go_sum = _write(tmp_path, 'go.sum', '\n'.join([
+        'github.com/gorilla/mux v1.8.0 h1:abc=',
+        'github.com/gorilla/mux v1.8.0/go.mod h1:def=',
+        'golang.org/x/sys v0.1.0/go.mod h1:ghi=',
+    ]))
+    # mux is listed in both files, but looked up once
+    assert list(lockfiles_purls([go_mod, go_sum])) == [
+        'pkg:golang/github.com/gorilla/mux@v1.8.0',
+        'pkg:golang/golang.org/x/text@v0.14.0',
+    ]
+
+def test_maven_dependency_list(tmp_path):
+    lockfile = _write(tmp_path, 'dependencies.txt', '\n'.join([
+        '[INFO] --- maven-dependency-plugin:3.6.0:list (default-cli) @ app ---',
+        '[INFO]',
+        '[INFO] The following files have been resolved:',
+        '[INFO]    org.apache.commons:commons-lang3:jar:3.12.0:compile',
+        '[INFO]    org.lwjgl:lwjgl:jar:natives-linux:3.3.1:runtime -- module org.lwjgl',
+        '[INFO] BUILD SUCCESS',
+    ]))
+    assert list(lockfiles_purls([lockfile])) == [
+        'pkg:maven/mavencentral/org.apache.commons/commons-lang3@3.12.0',
+        'pkg:maven/mavencentral/org.lwjgl/lwjgl@3.3.1',
+    ]
+
+def test_lookupurl_url_type():
+    assert isinstance(LookupURLFactory.lookupurl_url('pkg:golang/github.com/google/gemma@v1.0'), Go)
+    assert isinstance(LookupURLFactory.lookupurl_url('pkg:gem/google-apis-core@0.11.1'), Gem)
+
+def test_go_purl():
+    assert Go().purl_to_pkg_go_dev('pkg:golang/github.com/gorilla/mux@v1.8.0') == 'https://pkg.go.dev/github.com/gorilla/mux@v1.8.0'
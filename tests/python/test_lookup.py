@@ -87,3 +87,111 @@ def test_lookup_license_url_bad():
 
 
 
+
+# Lookup license text, cached
+#
+def test_lookup_license_text_cached():
+    data = open('tests/licenses/BSD-2-Clause.LICENSE').read()
+    first = ll.lookup_license_text(data)
+    reformatted = ' '.join(data.split()).upper()
+    second = ll.lookup_license_text(reformatted)
+    assert second['normalized'] == first['normalized']
+    assert second['provided'] == reformatted
+    assert first['provided'] == data
+
+def test_lookup_license_text_cached_copy():
+    data = open('tests/licenses/BSD-2-Clause.LICENSE').read()
+    first = ll.lookup_license_text(data)
+    first['normalized'].append({'license': 'MIT', 'score': 100.0})
+    second = ll.lookup_license_text(data)
+    assert second['normalized'] != first['normalized']
+
+def test_lookup_license_text_cached_path():
+    # the folded long text reads as the short text, but the
+    # short text is a license name, looked up by foss-flame
+    long = 'BSD3' + ' ' * 200
+    res_long = ll.lookup_license_text(long)
+    res_short = ll.lookup_license_text('bsd3')
+    assert res_long['identification'] == 'lookup-license'
+    assert res_short['identification'] == 'flame'
+
+# Lookup license text, verbatim copies
+#
+def test_lookup_license_text_fingerprint():
+    data = open('tests/licenses/Apache-2.0.LICENSE').read()
+    res = ll.lookup_license_text(f'Copyright 2025 Someone\n\n{data}')
+    assert res['normalized'] == [{'license': 'Apache-2.0', 'score': 100.0}]
+
+def test_lookup_license_text_fingerprint_as_matched():
+    # a verbatim copy is normalized as the scancode match of the text
+    data = open('tests/licenses/BSD-3-Clause.LICENSE').read()
+    verbatim = ll.lookup_license_text(data)
+    matched = ll.lookup_license_text(f'{data}\nThe above applies to all files.')
+    assert [x['license'] for x in verbatim['normalized']] == [x['license'] for x in matched['normalized']]
+
+def test_lookup_license_text_fingerprint_other_scancode(monkeypatch):
+    import lookup_license.fingerprints
+    monkeypatch.setattr(lookup_license.fingerprints, 'fingerprints', None)
+    monkeypatch.setattr(lookup_license.fingerprints, 'scancode_version', lambda: '0.0.1')
+    data = open('tests/licenses/Apache-2.0.LICENSE').read()
+    assert lookup_license.fingerprints.lookup_fingerprint(data) is None
+
+# Lookup license texts, batch
+#
+def test_lookup_license_texts():
+    mit_data = open('tests/licenses/MIT.LICENSE').read()
+    bsd3_data = open('tests/licenses/BSD-3-Clause.LICENSE').read()
+    texts = ['BSD3', f'{mit_data}\n{bsd3_data}', 'BSD3', f'{bsd3_data}\n{mit_data}']
+    res = list(ll.lookup_license_texts(texts, processes=2))
+    assert [index for index, result in res] == [0, 1, 2, 3]
+    assert res[0][1]['normalized'] == ['BSD-3-Clause']
+    assert res[2][1] == res[0][1]
+    assert res[3][1]['provided'] == texts[3]
+    assert sorted([x['license'] for x in res[3][1]['normalized']]) == ['BSD-3-Clause', 'MIT']
+
+    unordered = dict(ll.lookup_license_texts(texts, processes=2, ordered=False))
+    assert unordered == dict(res)
+
+def test_lookup_license_texts_workers(monkeypatch):
+    import lookup_license.pool
+    started = []
+
+    class _Pool(lookup_license.pool.LookupLicensePool):
+        def __init__(self, processes=None, warm=True):
+            started.append(processes)
+            super().__init__(processes, warm)
+
+    monkeypatch.setattr(lookup_license.pool, 'LookupLicensePool', _Pool)
+    monkeypatch.setattr('os.cpu_count', lambda: 8)
+    mit_data = open('tests/licenses/MIT.LICENSE').read()
+    bsd2_data = open('tests/licenses/BSD-2-Clause.LICENSE').read()
+    texts = [f'{mit_data}\nworkers test', f'{bsd2_data}\nworkers test']
+    assert len(list(ll.lookup_license_texts(texts))) == 2
+    # one worker per text, not per cpu
+    assert started == [2]
+
+# Lookup license file, in windows
+#
+def _notice_file(tmp_path):
+    filler = 'This component is used by the product and is listed here.\n' * 100
+    mit_data = open('tests/licenses/MIT.LICENSE').read()
+    bsd3_data = open('tests/licenses/BSD-3-Clause.LICENSE').read()
+    notice_file = tmp_path / 'NOTICE'
+    notice_file.write_text(f'{mit_data}\n{filler}{bsd3_data}\n{filler}{mit_data}\n{filler}')
+    return str(notice_file)
+
+def test_lookup_license_file_stream(tmp_path):
+    notice_file = _notice_file(tmp_path)
+    res = list(ll.lookup_license_file_stream(notice_file, window_lines=60, overlap_lines=30))
+    assert sorted([x['license'] for x in res]) == ['BSD-3-Clause', 'MIT']
+
+def test_lookup_license_file_stream_stable(tmp_path):
+    notice_file = _notice_file(tmp_path)
+    res = list(ll.lookup_license_file_stream(notice_file, window_lines=60, overlap_lines=30, stable_windows=1))
+    assert [x['license'] for x in res] == ['MIT']
+
+def test_lookup_license_file_streamed(tmp_path):
+    notice_file = _notice_file(tmp_path)
+    res = ll.lookup_license_file(notice_file, stream=True)
+    assert res['provided'] == notice_file
+    assert sorted([x['license'] for x in res['normalized']]) == ['BSD-3-Clause', 'MIT']
@@ -0,0 +1,113 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import pytest
+import time
+
+from lookup_license.cache import LookupLicenseCache
+from lookup_license.lookupurl.gitrepo import GitRepo
+from lookup_license.lookupurl.lookupurl import LookupURL
+from lookup_license.retrieve import Retriever
+
+MIT_DATA = open('tests/licenses/MIT.LICENSE').read()
+
+def _fake_download_url(downloaded):
+    def download_url(self, url):
+        downloaded.append(url)
+        found = url.endswith('/master/LICENSE') or url.endswith('/master/COPYING')
+        return {
+            'decoded_content': MIT_DATA if found else '404: Not Found',
+            'provided': url,
+            'code': 200 if found else 404,
+            'success': found,
+            'url': url,
+        }
+    return download_url
+
+def test_lookup_license_urls(monkeypatch, capsys):
+    downloaded = []
+    monkeypatch.setattr(Retriever, 'download_url', _fake_download_url(downloaded))
+    gitrepo = GitRepo()
+    suggestions = gitrepo.suggest_license_files('https://github.com/hesa/no-such-repo')
+    res = gitrepo.lookup_license_urls('https://github.com/hesa/no-such-repo', suggestions)
+
+    assert res['success']
+    assert res['identified_license'] == ['MIT', 'MIT']
+    # successful urls in the order they were suggested
+    assert [x['url'] for x in res['details']['successful_urls']] == [
+        'https://raw.githubusercontent.com/hesa/no-such-repo/master/LICENSE',
+        'https://raw.githubusercontent.com/hesa/no-such-repo/master/COPYING',
+    ]
+    # the 'main' branch failed, the 'develop' branch is not used
+    failed = [x['url'] for x in res['details']['failed_urls']]
+    assert len(failed) == len(suggestions[0]) + len(suggestions[1]) - 2
+    assert not [x for x in failed if '/develop/' in x]
+    assert set(downloaded) >= set([x['license_raw_url'] for x in suggestions[0] + suggestions[1]])
+    # nothing written to stdout, e.g. mixed with the --bulk output
+    assert capsys.readouterr().out == ''
+
+def test_lookup_urls_async(monkeypatch):
+    downloaded = []
+    monkeypatch.setattr(Retriever, 'download_url', _fake_download_url(downloaded))
+    urls = [f'https://github.com/hesa/no-such-repo-{i}' for i in range(3)]
+    LookupLicenseCache().disable()
+    try:
+        results = asyncio.run(GitRepo().lookup_urls_async(urls))
+    finally:
+        LookupLicenseCache().enable()
+
+    assert [res['provided'] for res in results] == urls
+    assert [res['identified_license_string'] for res in results] == ['MIT'] * 3
+
+class _SlowPackage(LookupURL):
+
+    def __init__(self, seconds):
+        super().__init__()
+        self.seconds = seconds
+        self.provider_versions = []
+
+    def get_parameters(self, url, version=None):
+        splits = url.split('@')
+        return {
+            'name': splits[0],
+            'version': splits[1] if len(splits) > 1 else version,
+        }
+
+    def lookup_package(self, url):
+        time.sleep(self.seconds)
+        return {
+            'licenses': [{'license': 'MIT'}],
+            'repo_suggestions': [],
+            'package_details': {'version': '2.0', 'package_license_texts': None},
+        }
+
+    def lookup_providers(self, url, version=None):
+        self.provider_versions.append(self.get_parameters(url, version)['version'])
+        time.sleep(self.seconds)
+        return {'provider': {'license': 'BSD-3-Clause', 'data_url': url}}
+
+    def lookup_url_impl(self, url, package_data=None, providers_data=None):
+        assert package_data
+        return None
+
+def test_lookup_url_concurrent():
+    LookupLicenseCache().disable()
+    try:
+        handler = _SlowPackage(0.5)
+        start = time.monotonic()
+        res = handler.lookup_url('slow-package@1.0')
+        elapsed = time.monotonic() - start
+
+        # without a version in the url, the providers wait for the package data
+        sequential = _SlowPackage(0.5).lookup_url('slow-package')
+    finally:
+        LookupLicenseCache().enable()
+
+    assert elapsed < 0.9
+    assert handler.provider_versions == ['1.0']
+    assert sorted(res['identified_license']) == ['BSD-3-Clause', 'MIT']
+    assert sorted(sequential['identified_license']) == ['BSD-3-Clause', 'MIT']
@@ -0,0 +1,27 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import gc
+import pytest
+
+from lookup_license.pool import LookupLicensePool
+
+def test_pool_lookup_license_texts():
+    mit_data = open('tests/licenses/MIT.LICENSE').read()
+    bsd3_data = open('tests/licenses/BSD-3-Clause.LICENSE').read()
+    with LookupLicensePool(processes=2) as pool:
+        res = [result for index, result in pool.lookup_license_texts([mit_data, bsd3_data, 'BSD-3-Clause'])]
+        assert res[0]['normalized'][0]['license'] == 'MIT'
+        assert res[1]['normalized'][0]['license'] == 'BSD-3-Clause'
+        assert res[2]['normalized'] == ['BSD-3-Clause']
+
+        res = pool.lookup_license_text(f'{mit_data}\n{bsd3_data}')
+        assert len(res['normalized']) == 2
+
+def test_pool_unfreezes():
+    # only the forked workers keep the objects frozen
+    with LookupLicensePool(processes=1):
+        assert gc.get_freeze_count() == 0
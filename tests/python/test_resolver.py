@@ -0,0 +1,96 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import io
+
+from lookup_license.cache import LookupLicenseCache
+from lookup_license.lookupurl.license_providers import LicenseProviders
+from lookup_license.resolver import LookupURLResolver
+from lookup_license.resolver import read_urls
+from lookup_license.retrieve import Retriever
+import lookup_license.config
+
+MIT_DATA = open('tests/licenses/MIT.LICENSE').read()
+
+def _download_url(self, url):
+    found = url.endswith('/master/LICENSE')
+    return {
+        'decoded_content': MIT_DATA if found else '404: Not Found',
+        'provided': url,
+        'code': 200 if found else 404,
+        'success': found,
+        'url': url,
+    }
+
+def test_read_urls():
+    fp = io.StringIO('pkg:pypi/boto3@1.0\n\n# comment\n  pkg:gem/rails@7.0  \n')
+    assert list(read_urls(fp)) == ['pkg:pypi/boto3@1.0', 'pkg:gem/rails@7.0']
+
+def test_resolve(monkeypatch):
+    monkeypatch.setattr(Retriever, 'download_url', _download_url)
+    urls = [
+        'https://github.com/hesa/no-such-repo-1',
+        'https://github.com/hesa/no-such-repo-2',
+        'https://github.com/hesa/no-such-repo-1',
+    ]
+    LookupLicenseCache().disable()
+    try:
+        results = list(LookupURLResolver(workers=2, url_type='git').resolve(urls))
+    finally:
+        LookupLicenseCache().enable()
+
+    assert sorted([url for url, result, error in results]) == sorted(set(urls))
+    assert [result['identified_license_string'] for url, result, error in results] == ['MIT', 'MIT']
+    assert [error for url, result, error in results] == [None, None]
+
+def test_resolve_no_url_type():
+    results = list(LookupURLResolver().resolve(['boto3']))
+    url, result, error = results[0]
+    assert url == 'boto3'
+    assert result is None
+    assert error
+
+class _EchoResolver(LookupURLResolver):
+
+    def lookup_url(self, url):
+        return {'provided': url}
+
+def test_resolve_incrementally():
+    read = []
+
+    def urls():
+        for i in range(10):
+            read.append(i)
+            yield f'pkg:pypi/package-{i}@1.0'
+
+    results = _EchoResolver(workers=2).resolve(urls())
+    url, result, error = next(results)
+    # the first result, before all urls are read
+    assert len(read) <= 3
+    assert result == {'provided': url}
+    assert len(list(results)) == 9
+    assert len(read) == 10
+
+def test_resolve_prefetch_incrementally(monkeypatch):
+    read = []
+    prefetched = []
+    monkeypatch.setattr(lookup_license.config, 'resolver_prefetch', True)
+    monkeypatch.setattr(lookup_license.config, 'clearlydefined_chunk_size', 3)
+    monkeypatch.setattr(LicenseProviders, 'prefetch_packages', lambda self, packages: prefetched.append(packages))
+
+    def urls():
+        for i in range(7):
+            read.append(i)
+            yield f'pkg:pypi/package-{i}@1.0'
+        yield 'pkg:pypi/no-version'
+
+    results = _EchoResolver(workers=2).resolve(urls())
+    next(results)
+    # the first batch, before all urls are read
+    assert len(read) == 3
+    assert prefetched == [[('pypi/pypi', None, f'package-{i}', '1.0') for i in range(3)]]
+    assert len(list(results)) == 7
+    assert [len(packages) for packages in prefetched] == [3, 3, 1]
@@ -0,0 +1,104 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+import asyncio
+import pytest
+import requests
+import time
+
+from lookup_license.cache import LookupLicenseCache
+from lookup_license.retrieve import AsyncRetriever
+from lookup_license.retrieve import Retriever
+from lookup_license.retrieve import http_session
+from servers import serve_in_thread
+
+def test_http_session_shared():
+    assert http_session() is http_session()
+
+def test_http_session_pool_sizes():
+    session = http_session()
+    assert session.get_adapter('https://pypi.org/pypi/requests/json')._pool_maxsize == 8
+    assert session.get_adapter('https://example.com/LICENSE')._pool_maxsize == 4
+    assert session.get_adapter('https://pypi.org/').max_retries.total == 3
+
+def test_http_stats():
+    assert isinstance(Retriever().stats(), dict)
+
+class _LicenseHandler(BaseHTTPRequestHandler):
+    etag = '"mit-1"'
+    requests = []
+
+    def do_GET(self):
+        _LicenseHandler.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b'MIT License'
+        self.send_response(200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_download_url_revalidate():
+    with serve_in_thread(HTTPServer(('127.0.0.1', 0), _LicenseHandler)) as server:
+        url = f'http://127.0.0.1:{server.server_port}/LICENSE-{time.time()}'
+        first = Retriever().download_url(url)
+        second = Retriever().download_url(url)
+
+    assert _LicenseHandler.requests == [None, '"mit-1"']
+    assert first['decoded_content'] == 'MIT License'
+    assert second['decoded_content'] == 'MIT License'
+    assert second['code'] == 200
+    assert second['success']
+
+def test_download_many():
+    with serve_in_thread(HTTPServer(('127.0.0.1', 0), _LicenseHandler)) as server:
+        urls = [f'http://127.0.0.1:{server.server_port}/LICENSE-{time.time()}-{i}' for i in range(5)]
+        urls.append('http://127.0.0.1:1/unreachable')
+        results = asyncio.run(AsyncRetriever().download_many(urls))
+
+    assert [res['url'] for res in results[:5]] == urls[:5]
+    assert [res['decoded_content'] for res in results[:5]] == ['MIT License'] * 5
+    assert isinstance(results[5], Exception)
+
+class _MissingHandler(BaseHTTPRequestHandler):
+    requests = 0
+
+    def do_GET(self):
+        _MissingHandler.requests += 1
+        self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def test_download_url_negative_cache():
+    with serve_in_thread(HTTPServer(('127.0.0.1', 0), _MissingHandler)) as server:
+        url = f'http://127.0.0.1:{server.server_port}/COPYING-{time.time()}'
+        first = Retriever().download_url(url)
+        second = Retriever().download_url(url)
+        LookupLicenseCache().set_update_mode(True)
+        third = Retriever().download_url(url)
+
+    assert [first['code'], second['code'], third['code']] == [404, 404, 404]
+    assert not second['success']
+    # the second download is answered by the cache, but not the third (update mode)
+    assert _MissingHandler.requests == 2
+
+def test_download_url_negative_cache_connection_error():
+    url = f'http://127.0.0.1:1/LICENSE-{time.time()}'
+    with pytest.raises(requests.exceptions.ConnectionError):
+        Retriever().download_url(url)
+    with pytest.raises(requests.exceptions.ConnectionError, match='failed recently'):
+        Retriever().download_url(url)
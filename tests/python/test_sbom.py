@@ -0,0 +1,146 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import io
+import json
+
+from lookup_license.resolver import LookupURLResolver
+from lookup_license.sbom import lookup_sbom
+from lookup_license.sbom import valid_spdx
+
+LICENSES = {
+    'pkg:pypi/boto3@1.35.99': 'Apache-2.0',
+    'pkg:gem/rails@7.0.4': 'MIT',
+    'pkg:pypi/scancode-only@1.0': 'LicenseRef-scancode-public-domain',
+}
+
+def _lookup_url(looked_up):
+    def lookup_url(self, url):
+        looked_up.append(url)
+        if url not in LICENSES:
+            raise Exception(f'{url} not found')
+        return {'provided': url, 'identified_license_string': LICENSES[url]}
+    return lookup_url
+
+def test_valid_spdx():
+    assert valid_spdx('MIT')
+    assert valid_spdx('MIT AND Apache-2.0')
+    assert not valid_spdx('BSD3')
+    assert not valid_spdx('NOASSERTION')
+    assert not valid_spdx(None)
+
+def test_lookup_sbom_cyclonedx(monkeypatch, tmp_path):
+    looked_up = []
+    monkeypatch.setattr(LookupURLResolver, 'lookup_url', _lookup_url(looked_up))
+    sbom = {
+        'bomFormat': 'CycloneDX',
+        'specVersion': '1.5',
+        'components': [
+            {'name': 'boto3', 'purl': 'pkg:pypi/boto3@1.35.99'},
+            {'name': 'requests', 'purl': 'pkg:pypi/requests@2.28.1', 'licenses': [{'license': {'id': 'Apache-2.0'}}]},
+            {'name': 'app', 'components': [{'name': 'rails', 'purl': 'pkg:gem/rails@7.0.4', 'licenses': [{'license': {'name': 'MIT License'}}]}]},
+            {'name': 'unknown', 'purl': 'pkg:pypi/unknown@1.0'},
+        ],
+    }
+    sbom_file = tmp_path / 'sbom.json'
+    sbom_file.write_text(json.dumps(sbom))
+    out = io.StringIO()
+    res = lookup_sbom(str(sbom_file), out)
+
+    enriched = json.loads(out.getvalue())
+    components = enriched['components']
+    assert sorted(looked_up) == ['pkg:gem/rails@7.0.4', 'pkg:pypi/boto3@1.35.99', 'pkg:pypi/unknown@1.0']
+    assert components[0]['licenses'] == [{'expression': 'Apache-2.0'}]
+    assert components[1]['licenses'] == [{'license': {'id': 'Apache-2.0'}}]
+    assert components[2]['components'][0]['licenses'] == [{'expression': 'MIT'}]
+    assert 'licenses' not in components[3]
+    assert res['failed'] == ['pkg:pypi/unknown@1.0']
+
+def test_lookup_sbom_spdx_json(monkeypatch, tmp_path):
+    looked_up = []
+    monkeypatch.setattr(LookupURLResolver, 'lookup_url', _lookup_url(looked_up))
+    sbom = {
+        'spdxVersion': 'SPDX-2.3',
+        'packages': [
+            {'name': 'boto3', 'licenseConcluded': 'NOASSERTION', 'externalRefs': [{'referenceCategory': 'PACKAGE-MANAGER', 'referenceType': 'purl', 'referenceLocator': 'pkg:pypi/boto3@1.35.99'}]},
+            {'name': 'rails', 'licenseDeclared': 'MIT', 'externalRefs': [{'referenceCategory': 'PACKAGE-MANAGER', 'referenceType': 'purl', 'referenceLocator': 'pkg:gem/rails@7.0.4'}]},
+        ],
+    }
+    sbom_file = tmp_path / 'sbom.spdx.json'
+    sbom_file.write_text(json.dumps(sbom))
+    out = io.StringIO()
+    lookup_sbom(str(sbom_file), out)
+
+    packages = json.loads(out.getvalue())['packages']
+    assert looked_up == ['pkg:pypi/boto3@1.35.99']
+    assert packages[0]['licenseConcluded'] == 'Apache-2.0'
+    assert 'licenseConcluded' not in packages[1]
+
+def test_lookup_sbom_spdx_tag_value(monkeypatch, tmp_path):
+    looked_up = []
+    monkeypatch.setattr(LookupURLResolver, 'lookup_url', _lookup_url(looked_up))
+    sbom = '\n'.join([
+        'SPDXVersion: SPDX-2.3',
+        'DocumentName: test',
+        '',
+        'PackageName: boto3',
+        'SPDXID: SPDXRef-boto3',
+        'PackageLicenseConcluded: NOASSERTION',
+        'ExternalRef: PACKAGE-MANAGER purl pkg:pypi/boto3@1.35.99',
+        '',
+        'PackageName: rails',
+        'SPDXID: SPDXRef-rails',
+        'ExternalRef: PACKAGE-MANAGER purl pkg:gem/rails@7.0.4',
+        '',
+        'Relationship: SPDXRef-DOCUMENT DESCRIBES SPDXRef-boto3',
+    ]) + '\n'
+    sbom_file = tmp_path / 'sbom.spdx'
+    sbom_file.write_text(sbom)
+    out = io.StringIO()
+    lookup_sbom(str(sbom_file), out)
+
+    lines = out.getvalue().splitlines()
+    assert sorted(looked_up) == ['pkg:gem/rails@7.0.4', 'pkg:pypi/boto3@1.35.99']
+    assert lines[5] == 'PackageLicenseConcluded: Apache-2.0'
+    assert lines[11] == 'PackageLicenseConcluded: MIT'
+    assert lines[-2] == ''
+    assert lines[-1] == 'Relationship: SPDXRef-DOCUMENT DESCRIBES SPDXRef-boto3'
+    assert len(lines) == len(sbom.splitlines()) + 1
+
+def test_lookup_sbom_spdx_not_spdx_license(monkeypatch, tmp_path):
+    # licenses that are not valid SPDX expressions end up in the comments
+    monkeypatch.setattr(LookupURLResolver, 'lookup_url', _lookup_url([]))
+    sbom = {
+        'spdxVersion': 'SPDX-2.3',
+        'packages': [
+            {'name': 'scancode-only', 'licenseComments': 'Checked manually.', 'externalRefs': [{'referenceCategory': 'PACKAGE-MANAGER', 'referenceType': 'purl', 'referenceLocator': 'pkg:pypi/scancode-only@1.0'}]},
+        ],
+    }
+    sbom_file = tmp_path / 'sbom.spdx.json'
+    sbom_file.write_text(json.dumps(sbom))
+    out = io.StringIO()
+    lookup_sbom(str(sbom_file), out)
+
+    package = json.loads(out.getvalue())['packages'][0]
+    assert package['licenseConcluded'] == 'NOASSERTION'
+    assert package['licenseComments'] == 'Checked manually.\nlookup-license found: LicenseRef-scancode-public-domain'
+
+    sbom = '\n'.join([
+        'SPDXVersion: SPDX-2.3',
+        '',
+        'PackageName: scancode-only',
+        'SPDXID: SPDXRef-scancode-only',
+        'ExternalRef: PACKAGE-MANAGER purl pkg:pypi/scancode-only@1.0',
+    ]) + '\n'
+    sbom_file = tmp_path / 'sbom.spdx'
+    sbom_file.write_text(sbom)
+    out = io.StringIO()
+    lookup_sbom(str(sbom_file), out)
+
+    assert out.getvalue().splitlines()[-2:] == [
+        'PackageLicenseConcluded: NOASSERTION',
+        'PackageLicenseComments: <text>lookup-license found: LicenseRef-scancode-public-domain</text>',
+    ]
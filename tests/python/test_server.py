@@ -0,0 +1,63 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from lookup_license.server import LookupLicenseServer
+from servers import serve_in_thread
+
+@pytest.fixture(scope='module')
+def server():
+    with serve_in_thread(LookupLicenseServer('127.0.0.1', 0, warm=False)) as server:
+        yield server
+
+def _request(server, path, data=None):
+    body = None if data is None else json.dumps(data).encode('utf-8')
+    try:
+        with urllib.request.urlopen(f'{server.url()}{path}', data=body) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_text(server):
+    code, result = _request(server, '/text', {'input': 'BSD3'})
+    assert code == 200
+    assert result['normalized'] == ['BSD-3-Clause']
+
+def test_file(server):
+    code, result = _request(server, '/file', {'input': 'tests/licenses/MIT.LICENSE'})
+    assert code == 200
+    assert [x['license'] for x in result['normalized']] == ['MIT']
+    # the path, not the content
+    assert result['provided'] == 'tests/licenses/MIT.LICENSE'
+
+def test_file_outside_directories(server):
+    code, result = _request(server, '/file', {'input': '/etc/passwd'})
+    assert code == 403
+    code, result = _request(server, '/file', {'input': 'tests/../../../etc/passwd'})
+    assert code == 403
+
+def test_validate_spdx(server):
+    code, result = _request(server, '/validate-spdx', {'input': 'MIT AND Apache-2.0'})
+    assert code == 200
+    code, result = _request(server, '/validate-spdx', {'input': 'LicenseRef-no-such-license'})
+    assert code == 422
+    assert 'error' in result
+
+def test_resources(server):
+    code, result = _request(server, '/resources')
+    assert code == 200
+    assert 'pypi' in result['package-types']
+
+def test_bad_requests(server):
+    assert _request(server, '/no-such-path', {'input': 'MIT'})[0] == 404
+    assert _request(server, '/text', {'text': 'MIT'})[0] == 400
+    assert _request(server, '/text', ['MIT'])[0] == 400
+    assert _request(server, '/text', 'MIT')[0] == 400
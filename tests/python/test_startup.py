@@ -0,0 +1,33 @@
+#!/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import subprocess
+import sys
+
+# modules to be imported only when used
+HEAVY_MODULES = ['licensedcode', 'scancode_config', 'flame', 'diskcache', 'requests', 'packageurl', 'xmltodict', 'magic']
+
+# modules loaded when importing the command line entry point, in
+# addition to the ones loaded by the interpreter itself (which depend
+# on the environment, e.g. site packages), raise with care
+MAX_STARTUP_MODULES = 80
+
+def _imported_modules(module):
+    code = f'import sys, json; import {module}; print(json.dumps(list(sys.modules)))'
+    output = subprocess.check_output([sys.executable, '-c', code])
+    return json.loads(output)
+
+def test_startup_imports():
+    modules = _imported_modules('lookup_license.__main__')
+    heavy = [module for module in modules if module.split('.')[0] in HEAVY_MODULES]
+    assert heavy == []
+    added = set(modules) - set(_imported_modules('sys'))
+    assert len(added) <= MAX_STARTUP_MODULES
+
+def test_version():
+    output = subprocess.check_output([sys.executable, '-m', 'lookup_license', '--version'])
+    assert output.decode().strip()